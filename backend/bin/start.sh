@@ -28,6 +28,10 @@ fi
 echo "Starting Celery worker..."
 celery -A config.celery worker --loglevel=info -c 4 &
 
+# Run Celery beat, which schedules the reservation expiry and archival
+echo "Starting Celery beat..."
+celery -A config.celery beat --loglevel=info &
+
 # Run Django development server
 echo "Starting Django development server..."
 python manage.py runserver 0.0.0.0:8000
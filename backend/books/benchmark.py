@@ -0,0 +1,247 @@
+"""
+Ingestion benchmark: synthetic Goodreads-style CSV files and a runner measuring ``process_csv`` on them.
+
+Reports are plain dicts so they can be written as JSON and compared across commits, see the
+``generate_books_csv`` and ``benchmark_ingestion`` management commands.
+"""
+import csv
+import random
+import resource
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connection
+from django.test.utils import override_settings
+
+from .models import IngestionLog
+from .storage import csv_upload_storage
+
+
+GOODREADS_COLUMNS = [
+    "book_id", "goodreads_book_id", "best_book_id", "work_id", "books_count", "isbn", "isbn13", "authors",
+    "original_publication_year", "original_title", "title", "language_code", "average_rating", "ratings_count",
+    "work_ratings_count", "work_text_reviews_count", "ratings_1", "ratings_2", "ratings_3", "ratings_4", "ratings_5",
+    "image_url", "small_image_url"
+]
+
+TITLE_WORDS = [
+    "The", "Shadow", "Night", "Garden", "River", "House", "Secret", "Last", "Winter", "Stone", "Fire", "Queen",
+    "Silent", "Road", "Glass", "City", "Wind", "Ocean", "Iron", "Golden", "Dark", "Little", "Lost", "Song", "Empire",
+    "Memory", "Light", "Wolf", "Crown", "Letters"
+]
+FIRST_NAMES = [
+    "Jane", "John", "Mary", "George", "Ana", "José", "Haruki", "Chimamanda", "Margaret", "Ernest", "Virginia",
+    "Gabriel", "Toni", "Leo", "Isabel", "Kazuo", "Zadie", "Fyodor", "Ursula", "Neil"
+]
+LAST_NAMES = [
+    "Austen", "Smith", "Shelley", "Orwell", "Silva", "Saramago", "Murakami", "Adichie", "Atwood", "Hemingway", "Woolf",
+    "García Márquez", "Morrison", "Tolstoy", "Allende", "Ishiguro", "Smith", "Dostoevsky", "Le Guin", "Gaiman"
+]
+LANGUAGE_CODES = ["eng", "eng", "eng", "en-US", "en-GB", "spa", "fre", "ger", "por", ""]
+
+
+def _isbn13(number):
+    digits = f"978{number:09d}"
+    check = (10 - sum(int(digit) * (3 if index % 2 else 1) for index, digit in enumerate(digits)) % 10) % 10
+    return digits + str(check)
+
+
+def _author(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _book_row(rng, number, multi_author_rate):
+    ratings = [rng.randint(0, 50000) for _ in range(5)]
+    ratings_count = sum(ratings)
+    authors = [_author(rng) for _ in range(rng.randint(2, 4) if rng.random() < multi_author_rate else 1)]
+    title = " ".join(rng.sample(TITLE_WORDS, rng.randint(1, 4)))
+    if rng.random() < 0.2:
+        title += f" ({rng.choice(TITLE_WORDS)} #{rng.randint(1, 9)})"
+    isbn13 = _isbn13(number)
+    year = rng.randint(1800, 2017)
+    average_rating = sum((index + 1) * count for index, count in enumerate(ratings)) / max(ratings_count, 1)
+
+    return {
+        "book_id": number,
+        "goodreads_book_id": number * 7,
+        "best_book_id": number * 7,
+        "work_id": number * 11,
+        "books_count": rng.randint(1, 300),
+        "isbn": isbn13[3:12] + "X" if rng.random() < 0.1 else isbn13[3:13],
+        # Goodreads exports store part of the ISBN-13 column as floats
+        "isbn13": f"{float(isbn13):.11e}" if rng.random() < 0.05 else isbn13,
+        "authors": ", ".join(authors),
+        "original_publication_year": f"{year}.0" if rng.random() < 0.5 else year,
+        "original_title": title if rng.random() < 0.8 else "",
+        "title": title,
+        "language_code": rng.choice(LANGUAGE_CODES),
+        "average_rating": round(average_rating, 2),
+        "ratings_count": ratings_count,
+        "work_ratings_count": ratings_count + rng.randint(0, 1000),
+        "work_text_reviews_count": rng.randint(0, 5000),
+        **{
+            f"ratings_{index + 1}": count
+            for index, count in enumerate(ratings)
+        },
+        "image_url": f"https://images.gr-assets.com/books/{number}m/{number}.jpg",
+        "small_image_url": f"https://images.gr-assets.com/books/{number}s/{number}.jpg",
+    }
+
+
+def _duplicate_row(rng, row):
+    duplicate = dict(row)
+    change = rng.random()
+    if change < 0.3:
+        duplicate["title"] = row["title"].upper()  # Same title and author, different case
+        duplicate["isbn13"] = duplicate["isbn"] = ""
+    elif change < 0.6:
+        duplicate["title"] = row["title"] + " (Reissue)"  # Same ISBN-13, different title
+    return duplicate
+
+
+def _broken_row(rng, row):
+    broken = dict(row)
+    column, value = rng.choice([
+        ("average_rating", "n/a"),
+        ("ratings_count", "unknown"),
+        ("isbn13", row["isbn13"] + "0000"),  # Too long for the column
+        ("original_publication_year", "circa 1900"),
+    ])
+    broken[column] = value
+    return broken
+
+
+def generate_books_csv(file, rows, duplicate_rate=0.05, error_rate=0.01, multi_author_rate=0.2, seed=0):
+    """
+    Write ``rows`` Goodreads-shaped book rows to a text ``file``.
+
+    About ``duplicate_rate`` of the rows repeat an earlier book, matching it on ISBN or on title and author,
+    ``error_rate`` of them carry a value that fails conversion or insertion and ``multi_author_rate`` list
+    several authors. The output only depends on the arguments, so the same ``seed`` gives the same file.
+    """
+    rng = random.Random(seed)
+    writer = csv.DictWriter(file, fieldnames=GOODREADS_COLUMNS)
+    writer.writeheader()
+
+    recent = []
+    for number in range(1, rows + 1):
+        draw = rng.random()
+        if recent and draw < duplicate_rate:
+            row = _duplicate_row(rng, rng.choice(recent))
+        else:
+            row = _book_row(rng, number, multi_author_rate)
+            if draw < duplicate_rate + error_rate:
+                row = _broken_row(rng, row)
+            elif len(recent) < 1000:
+                recent.append(row)
+            else:
+                recent[rng.randrange(len(recent))] = row
+
+        writer.writerow(row)
+
+
+def current_commit():
+    """Short hash of the checked out commit, or ``None`` outside of a git checkout."""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+class QueryCounter:
+    """Database execute wrapper counting the statements run, without keeping them in memory."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def _benchmark_environment(upload_dir):
+    # Run the chunk chord inline and keep the report email out of the measurement
+    with override_settings(
+        CELERY_TASK_ALWAYS_EAGER=True,
+        CELERY_TASK_EAGER_PROPAGATE=True,
+        EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+        STORAGES={
+            **settings.STORAGES,
+            "csv_uploads": {
+                "BACKEND": "django.core.files.storage.FileSystemStorage",
+                "OPTIONS": {
+                    "location": upload_dir,
+                },
+            },
+        },
+    ):
+        yield
+
+
+def measure_ingestion(path, trace_memory=False):
+    """
+    Ingest the CSV file at ``path`` with ``process_csv`` on the current database and report how it went.
+
+    Rows per second and queries per row cover the whole task, chunk planning and the report included.
+    Statements run through ``COPY`` are not counted as queries. With ``trace_memory``, the peak Python
+    allocation is traced with :mod:`tracemalloc`, which slows the run down noticeably.
+    """
+    from .tasks import process_csv
+
+    counter = QueryCounter()
+
+    with tempfile.TemporaryDirectory() as upload_dir, _benchmark_environment(upload_dir):
+        with open(path, "rb") as file:
+            file_name = csv_upload_storage().save("benchmark.csv", File(file))
+
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            process_csv(file_name, "benchmark@example.com", "benchmark.csv")
+        seconds = time.perf_counter() - started
+        peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        tracemalloc.stop()
+
+    log = IngestionLog.objects.get(source=file_name)
+    return {
+        "commit": current_commit(),
+        "database": connection.vendor,
+        "settings": {
+            "mode": settings.CSV_INGESTION_MODE,
+            "batch_size": settings.CSV_INGESTION_BATCH_SIZE,
+            "chunk_size": settings.CSV_INGESTION_CHUNK_SIZE,
+        },
+        "status": log.status,
+        "rows": log.rows_processed,
+        "inserted": log.rows_inserted,
+        "skipped": log.rows_skipped,
+        "failed": log.rows_failed,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(log.rows_processed / seconds, 1) if seconds else None,
+        "queries": counter.count,
+        "queries_per_row": round(counter.count / log.rows_processed, 4) if log.rows_processed else None,
+        "peak_memory_kb": peak_memory // 1024 if peak_memory is not None else None,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def compare_reports(baseline, report):
+    """
+    Relative change of the throughput metrics between two reports, positive meaning worse.
+
+    Returns ``{metric: change}`` where ``0.1`` means 10% slower or 10% more queries per row.
+    """
+    changes = {}
+    if baseline.get("rows_per_second") and report.get("rows_per_second"):
+        changes["rows_per_second"] = 1 - report["rows_per_second"] / baseline["rows_per_second"]
+    if baseline.get("queries_per_row") and report.get("queries_per_row") is not None:
+        changes["queries_per_row"] = report["queries_per_row"] / baseline["queries_per_row"] - 1
+    return changes
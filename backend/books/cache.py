@@ -0,0 +1,114 @@
+"""
+Versioned cache of anonymous book list and detail responses.
+
+Entries are keyed by a global catalog version, so any write to the catalog invalidates every cached
+response at once by bumping the version instead of deleting keys. Stale entries are never read again
+and expire after the ``books`` cache TIMEOUT, or are culled once MAX_ENTRIES is reached on locmem.
+"""
+import hashlib
+import json
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+
+CACHE_ALIAS = "books"
+VERSION_KEY = "catalog-version"
+MODIFIED_KEY = "catalog-modified-at"
+
+
+def book_cache():
+    return caches[CACHE_ALIAS]
+
+
+def catalog_version():
+    """Current catalog version, starting a new one if the cache lost it."""
+    cache = book_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Start from the clock rather than 1, so an evicted version never brings old entries back
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def catalog_modified_at():
+    """Time of the last catalog version bump, in seconds, or now if the cache lost it."""
+    cache = book_cache()
+    modified_at = cache.get(MODIFIED_KEY)
+    if modified_at is None:
+        cache.add(MODIFIED_KEY, time.time(), timeout=None)
+        modified_at = cache.get(MODIFIED_KEY)
+    return modified_at
+
+
+def _increment_version():
+    cache = book_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+    cache.set(MODIFIED_KEY, time.time(), timeout=None)
+
+
+def bump_catalog_version():
+    """
+    Invalidate every cached book response.
+
+    The version is bumped right away, so the writing process does not read its own stale responses, and
+    again once the transaction commits, in case a concurrent read cached the rows before the commit.
+    """
+    _increment_version()
+    transaction.on_commit(_increment_version)
+
+
+def normalize_query_params(query_params):
+    """Sorted ``(name, values)`` pairs of a request's query parameters, ignoring blank values."""
+    params = []
+    for name in sorted(query_params):
+        values = sorted(value.strip() for value in query_params.getlist(name) if value.strip())
+        if values:
+            params.append((name, values))
+    return params
+
+
+def response_cache_key(request, action, kwargs, etag=None):
+    signature = json.dumps([
+        etag,
+        request.get_host(),  # Pagination links are absolute
+        request.accepted_media_type,
+        action,
+        sorted((name, str(value)) for name, value in kwargs.items()),
+        normalize_query_params(request.query_params),
+    ])
+    return f"books:{catalog_version()}:{hashlib.sha1(signature.encode()).hexdigest()}"
+
+
+class CatalogCacheMixin:
+    """Serve ``list`` and ``retrieve`` from the book cache for anonymous users."""
+    # Validator of the requested page or book, set by ConditionalGetMixin. It is part of the cache key, so
+    # rows updated without going through the signals are not served stale either.
+    etag = None
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(super().retrieve, request, *args, **kwargs)
+
+    def _cached_response(self, view, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+
+        cache = book_cache()
+        key = response_cache_key(request, self.action, kwargs, self.etag)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data)
+        return response
@@ -0,0 +1,162 @@
+from collections import namedtuple
+
+from django.core.exceptions import ValidationError
+from django.core.validators import (
+    MaxLengthValidator, MaxValueValidator, MinValueValidator, ProhibitNullCharactersValidator
+)
+
+from .models import Author, Book
+from .utils import clean_isbn
+
+
+def parse_int(value):
+    """Parse an integer, accepting float notation such as ``"2000.0"`` found in exported CSV files."""
+    try:
+        return int(value)
+    except ValueError:
+        return int(float(value))
+
+
+def parse_text(value):
+    return value.strip() or None
+
+
+Column = namedtuple("Column", ["name", "parse", "default"], defaults=[None])
+Column.__doc__ = "A CSV column named after the model field it fills, parsed when not empty and ``default`` otherwise."
+
+BOOK_SCHEMA = (
+    Column("isbn13", clean_isbn),
+    Column("isbn", clean_isbn),
+    Column("goodreads_book_id", parse_int),
+    Column("best_book_id", parse_int),
+    Column("work_id", parse_int),
+    Column("books_count", parse_int, 1),
+    Column("original_publication_year", parse_int),
+    Column("title", parse_text),
+    Column("original_title", parse_text),
+    Column("language_code", parse_text),
+    Column("average_rating", float),
+    Column("ratings_count", parse_int),
+    Column("image_url", parse_text),
+    Column("small_image_url", parse_text),
+    Column("ratings_1", parse_int),
+    Column("ratings_2", parse_int),
+    Column("ratings_3", parse_int),
+    Column("ratings_4", parse_int),
+    Column("ratings_5", parse_int),
+    Column("work_ratings_count", parse_int),
+    Column("work_text_reviews_count", parse_int),
+)
+
+# Validators of the limits the database enforces, which would otherwise fail the insert of a whole batch
+DATABASE_LIMITS = (MaxLengthValidator, MaxValueValidator, MinValueValidator, ProhibitNullCharactersValidator)
+
+
+def database_limits(field):
+    """The validators of ``field`` checking a limit the database enforces too."""
+    return [validator for validator in field.validators if isinstance(validator, DATABASE_LIMITS)]
+
+
+def validated(parse, validators):
+    """Wrap ``parse`` so the values it returns are also checked by ``validators``, raising ``ValueError``."""
+
+    def parse_and_validate(value):
+        value = parse(value)
+        if value is not None:
+            try:
+                for validator in validators:
+                    validator(value)
+            except ValidationError as e:
+                raise ValueError(" ".join(e.messages)) from e
+        return value
+
+    return parse_and_validate
+
+
+class ConversionError(ValueError):
+    """A CSV value that could not be converted, naming the column and the value."""
+
+    def __init__(self, column, value, error):
+        self.column = column
+        self.value = value
+        super().__init__(f"{error} (column '{column}', value {value!r})")
+
+
+class RowConverter:
+    """
+    Convert CSV rows into unsaved model instances following a column schema.
+
+    The schema is compiled once into the positional argument layout of the model, so converting a row
+    is a single pass over the columns followed by the positional fast path of ``Model.__init__``.
+    Fields that are not in the schema, such as the primary key and timestamps, are left to their
+    defaults and filled in on insert. Parsed values are checked against the length and range limits of
+    their field, so a row the database would reject fails here, on its own.
+    """
+
+    def __init__(self, model, schema):
+        self.model = model
+        fields = [field.attname for field in model._meta.concrete_fields]
+        unknown = set(column.name for column in schema) - set(fields)
+        if unknown:
+            raise ValueError(f"Columns {sorted(unknown)} are not fields of {model.__name__}")
+
+        self._defaults = [field.get_default() for field in model._meta.concrete_fields]
+        self._columns = tuple((fields.index(column.name), column.name, self._checked(column), column.default)
+                              for column in schema)
+
+    def _checked(self, column):
+        validators = database_limits(self.model._meta.get_field(column.name))
+        return validated(column.parse, validators) if validators else column.parse
+
+    def __call__(self, row):
+        """Convert one row, raising :class:`ConversionError` for the first value that does not parse."""
+        values = self._defaults.copy()
+        for position, name, parse, default in self._columns:
+            value = row.get(name)
+            if not value:
+                values[position] = default
+                continue
+            try:
+                values[position] = parse(value)
+            except (TypeError, ValueError) as e:
+                raise ConversionError(name, value, e) from e
+        return self.model(*values)
+
+    def convert_many(self, rows):
+        """
+        Convert a batch of rows column by column.
+
+        Returns the list of instances, with ``None`` for rows that failed, and a ``{index: ConversionError}``
+        mapping reporting the first failing column of each of those rows.
+        """
+        columns = [self._defaults.copy() for _ in rows]
+        errors = {}
+
+        for position, name, parse, default in self._columns:
+            for index, value in enumerate(row.get(name) for row in rows):
+                if not value:
+                    columns[index][position] = default
+                    continue
+                try:
+                    columns[index][position] = parse(value)
+                except (TypeError, ValueError) as e:
+                    errors.setdefault(index, ConversionError(name, value, e))
+
+        instances = [None if index in errors else self.model(*values) for index, values in enumerate(columns)]
+        return instances, errors
+
+
+book_converter = RowConverter(Book, BOOK_SCHEMA)
+
+parse_author_name = validated(str.strip, database_limits(Author._meta.get_field("name")))
+
+
+def parse_author_names(value):
+    """Split an ``authors`` column into stripped names, raising :class:`ConversionError` for a name too long."""
+    names = []
+    for name in value.split(","):
+        try:
+            names.append(parse_author_name(name))
+        except ValueError as e:
+            raise ConversionError("authors", name, e) from e
+    return names
@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class IngestionStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    @classmethod
+    def choices(cls):
+        return [(member.value, member.name) for member in cls]
@@ -1,8 +1,8 @@
-from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
-from reservations.models import Reservation
+from rest_framework.filters import OrderingFilter, SearchFilter
 
 from .models import Book
+from .search import search_books, search_vector_enabled
 
 
 class BookFilter(filters.FilterSet):
@@ -13,12 +13,31 @@ class BookFilter(filters.FilterSet):
         fields = []
 
     def filter_reserved(self, queryset, name, value):
-        reservations = Reservation.objects.filter(
-            book=OuterRef('pk'),
-            status='reserved',
-        )
-
-        if value:
-            return queryset.annotate(is_reserved=Exists(reservations)).filter(is_reserved=True)
-        else:
-            return queryset.annotate(is_reserved=Exists(reservations)).filter(is_reserved=False)
+        return queryset.filter(is_reserved=value)
+
+
+class BookSearchFilter(SearchFilter):
+    """
+    Full-text search over the book search vector, ranked by relevance, on PostgreSQL.
+
+    Falls back to the ``icontains`` lookups of ``search_fields`` on other databases.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, '').strip()
+        if not term or not search_vector_enabled():
+            return super().filter_queryset(request, queryset, view)
+
+        books = search_books(queryset, term)
+        if 'rank' in books.query.annotations:
+            books = books.order_by('-rank')
+        return books
+
+
+class BookOrderingFilter(OrderingFilter):
+    """Ordering filter that keeps search results ranked by relevance unless an ordering is requested."""
+
+    def filter_queryset(self, request, queryset, view):
+        if 'rank' in queryset.query.annotations and not request.query_params.get(self.ordering_param):
+            return queryset
+        return super().filter_queryset(request, queryset, view)
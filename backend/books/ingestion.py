@@ -0,0 +1,503 @@
+import csv
+import hashlib
+from collections import namedtuple
+from functools import partial
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .converters import book_converter, parse_author_names
+from .models import Author, Book
+from .search import refresh_search_vectors
+from .suggestions import refresh_suggestions
+from .utils import book_exists, book_keys, existing_book_keys, normalize_name
+
+
+PendingRow = namedtuple("PendingRow", ["row_number", "row", "book", "author_names", "keys"])
+Chunk = namedtuple("Chunk", ["start", "end", "first_row", "rows"])
+
+
+class _OffsetLines:
+    """Iterate the decoded lines of a binary file, keeping track of the byte offset reached."""
+
+    def __init__(self, file, end=None):
+        self.file = file
+        self.end = end
+        self.offset = file.tell()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.end is not None and self.offset >= self.end:
+            raise StopIteration
+
+        line = self.file.readline()
+        if not line:
+            raise StopIteration
+
+        self.offset += len(line)
+        return line.decode("utf-8")
+
+
+def iter_csv_rows(file, start=None, end=None):
+    """
+    Stream the rows of a binary CSV file as ``(row, offset)`` pairs, decoding one line at a time.
+
+    ``offset`` is the byte position right after the row. ``start`` and ``end`` restrict the rows read
+    to a byte range, which must begin and end on row boundaries.
+    """
+    file.seek(0)
+    lines = _OffsetLines(file, end)
+    reader = csv.DictReader(lines)
+
+    if reader.fieldnames is None:
+        return
+
+    if start is not None and start > lines.offset:
+        file.seek(start)
+        lines.offset = start
+
+    for row in reader:
+        yield row, lines.offset
+
+
+def plan_chunks(file, chunk_size):
+    """
+    Split a binary CSV file into byte ranges of at most ``chunk_size`` rows.
+
+    Only quote characters are counted, so a row spanning several lines is never split in two.
+    """
+    file.seek(0)
+    header = file.readline()
+    if not header:
+        return []
+
+    chunks = []
+    start = offset = len(header)
+    rows = in_quotes = 0
+
+    for line in iter(file.readline, b""):
+        offset += len(line)
+        if line.count(b'"') % 2:
+            in_quotes = not in_quotes
+        if in_quotes:
+            continue
+
+        rows += 1
+        if rows % chunk_size == 0:
+            chunks.append(Chunk(start, offset, rows - chunk_size + 1, chunk_size))
+            start = offset
+
+    if offset > start:
+        chunks.append(Chunk(start, offset, rows - rows % chunk_size + 1, rows % chunk_size))
+
+    return chunks
+
+
+class DedupIndex:
+    """
+    In-memory index of the keys :func:`books.utils.book_exists` matches on, for every stored book.
+
+    ISBNs are kept as strings and (title, author) pairs as hashes, so large catalogues stay compact.
+    Membership checks replace the per-row ``book_exists`` query during bulk ingestion.
+    """
+
+    def __init__(self):
+        self.isbn13s = set()
+        self.isbns = set()
+        self.titles = set()
+
+    @classmethod
+    def load(cls, keys=None, batch_size=5000):
+        """
+        Build the index from the books already in the database.
+
+        With ``keys``, only the stored keys among them are loaded, in a few queries per ``batch_size`` keys.
+        The index then answers for rows whose keys were all given, without scanning the catalogue.
+        """
+        index = cls()
+
+        if keys is not None:
+            keys = sorted(keys)  # Grouped by kind, so each batch needs few queries
+            for i in range(0, len(keys), batch_size):
+                index.add(existing_book_keys(set(keys[i:i + batch_size])))
+            return index
+
+        for isbn13, isbn in Book.objects.values_list("isbn13", "isbn").iterator(chunk_size=10000):
+            if isbn13:
+                index.isbn13s.add(isbn13)
+            if isbn:
+                index.isbns.add(isbn)
+
+        pairs = Book.authors.through.objects.values_list("book__title", "author__normalized_name")
+        for title, author in pairs.iterator(chunk_size=10000):
+            index.titles.add(hash((title.upper(), author)))
+
+        return index
+
+    def __contains__(self, key):
+        if key[0] == "title":
+            return hash(key[1:]) in self.titles
+        if key[0] == "isbn13":
+            return key[1] in self.isbn13s
+        return key[1] in self.isbns
+
+    def matches(self, keys):
+        """Whether any of the keys belongs to an indexed book."""
+        return any(key in self for key in keys)
+
+    def add(self, keys):
+        for key in keys:
+            if key[0] == "title":
+                self.titles.add(hash(key[1:]))
+            elif key[0] == "isbn13":
+                self.isbn13s.add(key[1])
+            else:
+                self.isbns.add(key[1])
+
+
+def key_lock_id(key):
+    """Advisory lock id of a :func:`books.utils.book_keys` key, the same in every process."""
+    return int.from_bytes(hashlib.blake2b(repr(key).encode(), digest_size=8).digest(), "big", signed=True)
+
+
+def lock_book_keys(keys):
+    """
+    Lock the book keys for the rest of the transaction, so concurrent ingestions never insert the same book.
+
+    Only batches sharing a key wait on each other. The locks are taken in one query in id order, so two
+    batches locking overlapping keys cannot deadlock.
+    """
+    if connection.vendor == "postgresql" and keys:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(id) FROM unnest(%s::bigint[]) AS id ORDER BY id",
+                [sorted(set(key_lock_id(key) for key in keys))],
+            )
+
+
+# Builds an unsaved Book instance from a CSV row, see books.converters.BOOK_SCHEMA
+build_book = book_converter
+
+
+class AuthorResolver:
+    """
+    Map author names to Author ids for the duration of an ingestion run.
+
+    Unknown names are prefetched by ``normalized_name`` in batches and the ones still missing are
+    inserted with a single ``bulk_create`` that ignores conflicts on the unique ``normalized_name``,
+    so each author costs a few queries per run instead of several per row.
+    """
+
+    def __init__(self, prefetch_size=1000):
+        self.prefetch_size = prefetch_size
+        self._ids = {}
+        self._uncommitted = set()
+        # Names without any ASCII character, which all normalize to "", by their original spelling
+        self._raw_ids = {}
+        self._uncommitted_raw = set()
+
+    def resolve(self, names):
+        """Return a ``{name: author_id}`` mapping, creating the authors that do not exist yet."""
+        normalized_names = {
+            name: normalize_name(name)
+            for name in names
+        }
+        resolved = {}
+
+        missing = set(normalized for normalized in normalized_names.values() if normalized not in self._ids)
+        missing.discard("")
+        if missing:
+            self._fetch(missing)
+
+        new_authors = {}
+        for name, normalized in normalized_names.items():
+            if not normalized:
+                if name not in self._raw_ids:
+                    self._raw_ids[name] = Author.objects.get_or_create(name=name)[0].pk
+                    self._uncommitted_raw.add(name)
+                resolved[name] = self._raw_ids[name]
+            elif normalized not in self._ids:
+                new_authors.setdefault(normalized, Author(name=name, normalized_name=normalized))
+
+        if new_authors:
+            Author.objects.bulk_create(new_authors.values(), ignore_conflicts=True)
+            self._fetch(new_authors.keys())
+            self._uncommitted.update(new_authors.keys())
+
+        for name, normalized in normalized_names.items():
+            if normalized:
+                if normalized not in self._ids:
+                    raise ValueError(f"Could not resolve author '{name}'")
+                resolved[name] = self._ids[normalized]
+
+        return resolved
+
+    def commit(self):
+        """Keep the authors created since the last call, once their transaction has committed."""
+        self._uncommitted.clear()
+        self._uncommitted_raw.clear()
+
+    def rollback(self):
+        """Forget the authors created since the last commit, after their transaction rolled back."""
+        for normalized in self._uncommitted:
+            self._ids.pop(normalized, None)
+        for name in self._uncommitted_raw:
+            self._raw_ids.pop(name, None)
+        self._uncommitted.clear()
+        self._uncommitted_raw.clear()
+
+    def _fetch(self, normalized_names):
+        normalized_names = sorted(normalized_names)
+        for i in range(0, len(normalized_names), self.prefetch_size):
+            batch = normalized_names[i:i + self.prefetch_size]
+            self._ids.update(Author.objects.filter(normalized_name__in=batch).values_list("normalized_name", "id"))
+
+
+class BatchIngestor:
+    """
+    Collect CSV rows into batches and write each batch with ``bulk_create``.
+
+    Rows with values the database would reject fail on conversion, before their batch is written. A batch
+    is written in a single transaction. If that fails anyway, it is split and retried in halves until only
+    the offending rows end up in the error list.
+
+    Each flush locks the keys of its batch (see :func:`lock_book_keys`) and re-checks the batch against the
+    database, so ingestors running in parallel on chunks of the same file never insert the same book twice.
+
+    When a :class:`DedupIndex` is given, rows are checked against it instead of querying ``book_exists``
+    for each of them, and the index is kept up to date as batches are written.
+
+    When a ``checkpoint`` callable is given, it receives :meth:`state` inside the transaction of every
+    flush, so the saved progress always matches the rows committed.
+    """
+
+    def __init__(self, batch_size=None, first_row=1, dedup_index=None, checkpoint=None):
+        self.batch_size = batch_size or settings.CSV_INGESTION_BATCH_SIZE
+        self.first_row = first_row
+        self.dedup_index = dedup_index
+        self.checkpoint = checkpoint
+        self.authors = AuthorResolver()
+        self.offset = None
+        self.books_processed = 0
+        self.books_inserted = 0
+        self.books_skipped = 0
+        self._errors = []
+        self._pending = []
+        self._pending_keys = set()
+        self._flushed_rows = 0
+
+    @property
+    def errors(self):
+        """Error messages in the order their rows appear in the file."""
+        return [message for _, message in self.numbered_errors]
+
+    @property
+    def numbered_errors(self):
+        """``(row_number, message)`` pairs sorted by row number."""
+        return sorted(self._errors, key=lambda error: error[0])
+
+    def state(self):
+        """Progress of the run, as stored by checkpoints and returned by chunk tasks."""
+        return {
+            "offset": self.offset,
+            "processed": self.books_processed,
+            "inserted": self.books_inserted,
+            "skipped": self.books_skipped,
+            "errors": self.numbered_errors,
+        }
+
+    def restore(self, state):
+        """Resume from a :meth:`state` saved by an earlier run."""
+        self.offset = state["offset"]
+        self.books_processed = self._flushed_rows = state["processed"]
+        self.books_inserted = state["inserted"]
+        self.books_skipped = state["skipped"]
+        self._errors = [tuple(error) for error in state["errors"]]
+
+    def add(self, row, offset=None):
+        """Queue a row for insertion, flushing once ``batch_size`` rows went by since the last flush."""
+        row_number = self.first_row + self.books_processed
+        self.books_processed += 1
+        self._queue(row_number, row)
+        self.offset = offset
+
+        if self.books_processed - self._flushed_rows >= self.batch_size:
+            self.flush()
+
+    def close(self):
+        """Release anything held for the run; called once the last batch has been flushed."""
+
+    def flush(self):
+        """Write the pending batch and save a checkpoint, retrying in smaller batches if it fails."""
+        pending, self._pending = self._pending, []
+        self._pending_keys = set()
+        self._flushed_rows = self.books_processed
+
+        if not pending and self.checkpoint is None:
+            return
+
+        with transaction.atomic():
+            if pending:
+                # Locked once for the whole batch, as the retries of a failed batch must not lock in another order
+                lock_book_keys(set().union(*(entry.keys for entry in pending)))
+                # Bulk inserts skip the signals keeping the search vectors and suggestions up to date
+                self._refresh_derived(self._write_pending(pending))
+            if self.checkpoint is not None:
+                self.checkpoint(self.state())
+
+    def _queue(self, row_number, row):
+        try:
+            keys = book_keys(row)
+            if self._exists(row, keys) or not keys.isdisjoint(self._pending_keys):
+                self.books_skipped += 1
+                return
+
+            author_names = parse_author_names(row["authors"])
+            book = build_book(row)
+        except Exception as e:
+            self._add_error(row_number, row, e)
+            return
+
+        self._pending.append(PendingRow(row_number, row, book, author_names, keys))
+        self._pending_keys.update(keys)
+
+    def _write_pending(self, pending):
+        """
+        Write the pending entries, returning the ones inserted.
+
+        A failing batch is split in halves until the failing rows are isolated, so a bad row among ``n`` costs
+        about ``2 * log2(n)`` batch writes instead of ``n`` single-row ones.
+        """
+        try:
+            return self._write_batch(pending)
+        except Exception as e:
+            if len(pending) == 1:
+                self._add_error(pending[0].row_number, pending[0].row, e)
+                return []
+
+        for entry in pending:
+            entry.book.pk = None
+        middle = len(pending) // 2
+        return self._write_pending(pending[:middle]) + self._write_pending(pending[middle:])
+
+    def _exists(self, row, keys):
+        if self.dedup_index is None:
+            return book_exists(row)
+        return self.dedup_index.matches(keys)
+
+    def _write_batch(self, entries):
+        """Write the entries in a single transaction, updating the counters once it has committed."""
+        try:
+            with transaction.atomic():
+                inserted, existing = self._write(entries)
+        except Exception:
+            self.authors.rollback()
+            raise
+
+        self.authors.commit()
+        if self.dedup_index is not None:
+            self.dedup_index.add(existing.union(*(entry.keys for entry in inserted)))
+
+        self.books_inserted += len(inserted)
+        self.books_skipped += len(entries) - len(inserted)
+        return inserted
+
+    def _write(self, entries):
+        """Insert the entries that are still new, returning them along with the keys found already stored."""
+        existing = existing_book_keys(set().union(*(entry.keys for entry in entries)))
+        entries = [entry for entry in entries if entry.keys.isdisjoint(existing)]
+        if not entries:
+            return entries, existing
+
+        authors = self.authors.resolve({name
+                                        for entry in entries
+                                        for name in entry.author_names})
+
+        Book.objects.bulk_create([entry.book for entry in entries])
+
+        through = Book.authors.through
+        links = []
+        for entry in entries:
+            author_ids = set(authors[name] for name in entry.author_names)
+            links.extend(through(book_id=entry.book.pk, author_id=author_id) for author_id in author_ids)
+        through.objects.bulk_create(links)
+
+        return entries, existing
+
+    def _refresh_derived(self, entries):
+        """Update the search vectors and suggestions of the inserted entries in a few set-based queries."""
+        if not entries:
+            return
+        refresh_search_vectors(entry.book.pk for entry in entries)
+        refresh_suggestions(
+            titles=set(entry.book.title for entry in entries),
+            author_keys={normalize_name(name)
+                         for entry in entries
+                         for name in entry.author_names},
+        )
+
+    def _add_error(self, row_number, row, error):
+        self._errors.append((row_number, f"Error processing book '{row.get('title', 'Unknown')}': {str(error)}"))
+
+
+def ingest_file(file, chunk=None, batch_size=None, mode=None, checkpoint=None):
+    """
+    Run an ingestor over a binary CSV file, or over a single chunk of it.
+
+    ``mode`` is ``"batch"`` for :class:`BatchIngestor` or ``"copy"`` for the PostgreSQL ``COPY`` path,
+    defaulting to ``CSV_INGESTION_MODE``. Chunks of at least ``CSV_INGESTION_INDEX_MIN_ROWS`` rows preload
+    a :class:`DedupIndex` of the stored books their keys match, which costs a read of the chunk and a few
+    queries per thousands of rows but saves a duplicate check query per row.
+
+    With an :class:`~books.models.IngestionCheckpoint`, the run resumes after the last committed row and
+    saves its progress on every flush, marking the checkpoint completed at the end. The progress of the
+    IngestionLog is refreshed from the checkpoints at most every ``CSV_INGESTION_PROGRESS_INTERVAL`` seconds.
+    """
+    from .copy_ingestion import CopyIngestor
+
+    start, end, first_row, rows = chunk or (None, None, 1, None)
+    if checkpoint is not None and checkpoint.offset is not None:
+        resume_from = checkpoint.offset
+    else:
+        resume_from = start
+
+    dedup_index = None
+    if rows is None or rows >= settings.CSV_INGESTION_INDEX_MIN_ROWS:
+        # Only the keys of the rows left to ingest, so the chunks of a file never scan the whole catalogue
+        dedup_index = DedupIndex.load(_row_keys(file, resume_from, end))
+
+    ingestor_class = BatchIngestor
+    if (mode or settings.CSV_INGESTION_MODE) == "copy" and connection.vendor == "postgresql":
+        ingestor_class = CopyIngestor
+
+    ingestor = ingestor_class(batch_size, first_row=first_row, dedup_index=dedup_index)
+    if checkpoint is not None:
+        ingestor.checkpoint = partial(checkpoint.save_state, progress_interval=settings.CSV_INGESTION_PROGRESS_INTERVAL)
+        if checkpoint.offset is not None:
+            ingestor.restore(checkpoint.state)
+    start = resume_from
+
+    try:
+        for row, offset in iter_csv_rows(file, start, end):
+            ingestor.add(row, offset)
+        ingestor.flush()
+    finally:
+        ingestor.close()
+
+    if checkpoint is not None:
+        checkpoint.save_state(ingestor.state(), completed=True)
+
+    return ingestor
+
+
+def _row_keys(file, start, end):
+    """The :func:`books.utils.book_keys` of the rows in a byte range; malformed rows are left to the ingestor."""
+    keys = set()
+    for row, _ in iter_csv_rows(file, start, end):
+        try:
+            keys.update(book_keys(row))
+        except Exception:
+            pass
+    return keys
@@ -0,0 +1,69 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from books.benchmark import compare_reports, measure_ingestion
+
+
+class Command(BaseCommand):
+    help = (
+        "Ingest a CSV file into a throwaway test database and report rows/second, queries per row and memory. "
+        "Runs against the configured database engine, so set DATABASE_ENGINE=sqlite3 to benchmark on SQLite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to ingest, see the generate_books_csv command.")
+        parser.add_argument("--mode", choices=["batch", "copy"], help="Overrides CSV_INGESTION_MODE.")
+        parser.add_argument("--batch-size", type=int, help="Overrides CSV_INGESTION_BATCH_SIZE.")
+        parser.add_argument("--chunk-size", type=int, help="Overrides CSV_INGESTION_CHUNK_SIZE.")
+        parser.add_argument("--trace-memory", action="store_true", help="Trace the peak Python allocation (slower).")
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+        parser.add_argument("--baseline", help="JSON report of an earlier run to compare against.")
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            default=10,
+            help="Fail when rows/second or queries per row got worse than the baseline by more than this percentage.",
+        )
+
+    def handle(self, *args, **options):
+        overrides = {
+            setting: options[option]
+            for option, setting in [
+                ("mode", "CSV_INGESTION_MODE"),
+                ("batch_size", "CSV_INGESTION_BATCH_SIZE"),
+                ("chunk_size", "CSV_INGESTION_CHUNK_SIZE"),
+            ] if options[option] is not None
+        }
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(**overrides):
+                report = measure_ingestion(options["path"], trace_memory=options["trace_memory"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report["file"] = options["path"]
+        output = json.dumps(report, indent=2)
+        self.stdout.write(output)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+
+        if options["baseline"]:
+            self._check_regressions(options["baseline"], report, options["max_regression"])
+
+    def _check_regressions(self, baseline_path, report, max_regression):
+        with open(baseline_path) as file:
+            baseline = json.load(file)
+
+        regressions = []
+        for metric, change in compare_reports(baseline, report).items():
+            self.stdout.write(f"{metric}: {change:+.1%} against {baseline.get('commit') or baseline_path}")
+            if change * 100 > max_regression:
+                regressions.append(metric)
+
+        if regressions:
+            raise CommandError(f"Regression above {max_regression}% in: {', '.join(regressions)}")
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from books.benchmark import generate_books_csv
+
+
+class Command(BaseCommand):
+    help = "Write a synthetic Goodreads-style books CSV file for ingestion benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Where to write the CSV file.")
+        parser.add_argument("--rows", type=int, default=10000, help="Data rows, e.g. 10000, 100000 or 1000000.")
+        parser.add_argument("--duplicate-rate", type=float, default=0.05, help="Share of rows repeating a book.")
+        parser.add_argument("--error-rate", type=float, default=0.01, help="Share of rows with an invalid value.")
+        parser.add_argument("--multi-author-rate", type=float, default=0.2, help="Share of rows with several authors.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed writes the same file.")
+
+    def handle(self, *args, **options):
+        with open(options["path"], "w", newline="", encoding="utf-8") as file:
+            generate_books_csv(
+                file,
+                options["rows"],
+                duplicate_rate=options["duplicate_rate"],
+                error_rate=options["error_rate"],
+                multi_author_rate=options["multi_author_rate"],
+                seed=options["seed"],
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['rows']} rows to {options['path']}"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from books.models import Suggestion
+from books.suggestions import rebuild_suggestions
+
+
+class Command(BaseCommand):
+    help = "Rebuild the title and author autocomplete suggestions from the catalogue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000, help="Titles or authors refreshed per query.")
+
+    def handle(self, *args, **options):
+        rebuild_suggestions(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {Suggestion.objects.count()} suggestions"))
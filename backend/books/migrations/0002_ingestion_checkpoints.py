@@ -0,0 +1,47 @@
+# Generated by Django 5.1.5 on 2026-10-18 02:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestionlog',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ingestionlog',
+            name='source',
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='ingestionlog',
+            name='records_processed',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='IngestionCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chunk', models.IntegerField()),
+                ('offset', models.BigIntegerField(blank=True, null=True)),
+                ('rows_processed', models.IntegerField(default=0)),
+                ('rows_inserted', models.IntegerField(default=0)),
+                ('rows_skipped', models.IntegerField(default=0)),
+                ('errors', models.JSONField(default=list)),
+                ('completed', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('log', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='books.ingestionlog')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('log', 'chunk'), name='unique_ingestion_checkpoint')],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.5 on 2026-10-18 02:46
+
+from django.db import migrations, models
+
+
+def mark_finished_logs_done(apps, schema_editor):
+    # Logs written before this migration were only created once their ingestion had finished
+    IngestionLog = apps.get_model('books', 'IngestionLog')
+    IngestionLog.objects.filter(source__isnull=True).update(status='done', rows_inserted=models.F('records_processed'))
+    IngestionLog.objects.filter(completed_at__isnull=False).update(status='done')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0002_ingestion_checkpoints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestionlog',
+            name='progress_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ingestionlog',
+            name='rows_failed',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ingestionlog',
+            name='rows_inserted',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ingestionlog',
+            name='rows_processed',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ingestionlog',
+            name='rows_skipped',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ingestionlog',
+            name='rows_total',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ingestionlog',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ingestionlog',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10),
+        ),
+        migrations.RunPython(mark_finished_logs_done, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.5 on 2026-10-18 02:57
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+SEARCH_INDEX = django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='book_search_vector_idx')
+
+
+def create_search_index(apps, schema_editor):
+    # GIN indexes only exist on PostgreSQL; elsewhere search falls back to SearchFilter
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('books', 'Book'), SEARCH_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('books', 'Book'), SEARCH_INDEX)
+
+
+def fill_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    Author = apps.get_model('books', 'Author')
+    Book = apps.get_model('books', 'Book')
+    author_names = Author.objects.filter(books=OuterRef('pk')).values('books').annotate(
+        names=StringAgg('name', ' ')
+    ).values('names')
+
+    Book.objects.update(
+        search_vector=SearchVector('title', weight='A', config='simple')
+        + SearchVector(Subquery(author_names), weight='B', config='simple')
+        + SearchVector('original_title', weight='C', config='simple')
+        + SearchVector('isbn', 'isbn13', weight='D', config='simple')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0004_book_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='book', index=SEARCH_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_index, drop_search_index),
+            ],
+        ),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.5 on 2026-10-18 03:23
+
+from django.db import migrations, models
+
+
+def store_reserved_state(apps, schema_editor):
+    Book = apps.get_model('books', 'Book')
+    Reservation = apps.get_model('reservations', 'Reservation')
+    active = Reservation.objects.filter(book=models.OuterRef('pk'), status='reserved')
+    Book.objects.filter(models.Exists(active)).update(is_reserved=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0007_book_updated_at_index'),
+        ('reservations', '0002_reservation_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='is_reserved',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('is_reserved', True)), fields=['id'], name='book_reserved_idx'),
+        ),
+        migrations.RunPython(store_reserved_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.5 on 2026-10-18 03:36
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+TITLE_TRIGRAM_INDEX = django.contrib.postgres.indexes.GinIndex(
+    django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('title'), name='gin_trgm_ops'),
+    name='book_title_trgm_idx',
+)
+
+
+def has_trigram_extension(schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def create_trigram_index(apps, schema_editor):
+    # Trigram indexes need pg_trgm (PostgreSQL contrib); without it icontains searches scan the table
+    if has_trigram_extension(schema_editor):
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.add_index(apps.get_model('books', 'Book'), TITLE_TRIGRAM_INDEX)
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {TITLE_TRIGRAM_INDEX.name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0008_book_is_reserved'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='book', index=TITLE_TRIGRAM_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(create_trigram_index, drop_trigram_index),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 04:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0009_book_title_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestionlog',
+            name='chunks_dispatched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,5 +1,13 @@
+from datetime import timedelta
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, Upper
+from django.utils import timezone
 
+from books.enums import IngestionStatus
 from books.utils import normalize_name
 
 
@@ -35,14 +43,14 @@ class Book(models.Model):
 
     authors = models.ManyToManyField("Author", related_name="books")
 
-    original_publication_year = models.IntegerField(null=True, blank=True, db_index=True)
+    original_publication_year = models.IntegerField(null=True, blank=True)
     original_title = models.CharField(max_length=255, null=True, blank=True, db_index=True)
-    title = models.CharField(max_length=255, db_index=True)
+    title = models.CharField(max_length=255)
 
     language_code = models.CharField(max_length=10, null=True, blank=True)
 
-    average_rating = models.FloatField(null=True, blank=True, db_index=True)
-    ratings_count = models.IntegerField(null=True, blank=True, db_index=True)
+    average_rating = models.FloatField(null=True, blank=True)
+    ratings_count = models.IntegerField(null=True, blank=True)
     work_ratings_count = models.IntegerField(null=True, blank=True)
     work_text_reviews_count = models.IntegerField(null=True, blank=True)
 
@@ -55,17 +63,158 @@ class Book(models.Model):
     image_url = models.URLField(null=True, blank=True)
     small_image_url = models.URLField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # Validator of the conditional GETs
+
+    # Whether the book has an active reservation, maintained by reservations.models.refresh_reserved_books
+    is_reserved = models.BooleanField(default=False, editable=False)
+
+    # Maintained by books.search.refresh_search_vectors, PostgreSQL only
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        # One (field, id) index per ordering of the API, matching the keyset pagination of BookPagination
+        indexes = [
+            models.Index(fields=["title", "id"], name="book_title_id_idx"),
+            models.Index(fields=["average_rating", "id"], name="book_average_rating_id_idx"),
+            models.Index(fields=["ratings_count", "id"], name="book_ratings_count_id_idx"),
+            models.Index(fields=["original_publication_year", "id"], name="book_publication_year_id_idx"),
+            GinIndex(fields=["search_vector"], name="book_search_vector_idx"),
+            # Case-insensitive title lookups of the ingestion dedup check and of the suggestions
+            models.Index(Upper("title"), name="book_upper_title_idx"),
+            # Substring title search of the reservation list (book__title__icontains), PostgreSQL with pg_trgm only
+            GinIndex(OpClass(Upper("title"), name="gin_trgm_ops"), name="book_title_trgm_idx"),
+            # Reserved books are few, so ?reserved=true scans this small index instead of the table
+            models.Index(fields=["id"], condition=Q(is_reserved=True), name="book_reserved_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
 
+class Suggestion(models.Model):
+    """Autocomplete entry for a book title or an author, maintained by books.suggestions."""
+    TITLE = "title"
+    AUTHOR = "author"
+    KIND_CHOICES = [(TITLE, "Title"), (AUTHOR, "Author")]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    key = models.CharField(max_length=255)  # normalize_name of the text, matched by prefix
+    text = models.CharField(max_length=255)
+    weight = models.BigIntegerField(default=0)  # Ratings count of the title or of all the books of the author
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["kind", "key"], name="unique_suggestion")]
+        indexes = [
+            models.Index(fields=["key"], name="suggestion_key_prefix_idx", opclasses=["varchar_pattern_ops"]),
+            models.Index(fields=["-weight"], name="suggestion_weight_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.text} ({self.kind})"
+
+
 class IngestionLog(models.Model):
+    """Ingestion job for an uploaded CSV file, created when the upload is accepted and updated as it runs."""
+    STATUS_CHOICES = [(status.value, status.name.capitalize()) for status in IngestionStatus]
+
     filename = models.CharField(max_length=255)
-    records_processed = models.IntegerField()
+    source = models.CharField(max_length=255, null=True, blank=True, unique=True)  # Name in the upload storage
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    records_processed = models.IntegerField(default=0)  # Books inserted, kept for existing consumers
     errors = models.TextField(null=True, blank=True)
+
+    rows_total = models.IntegerField(null=True, blank=True)
+    rows_processed = models.IntegerField(default=0)
+    rows_inserted = models.IntegerField(default=0)
+    rows_skipped = models.IntegerField(default=0)
+    rows_failed = models.IntegerField(default=0)
+
     ingested_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    chunks_dispatched_at = models.DateTimeField(null=True, blank=True)  # Chord of chunk tasks sent
+    progress_updated_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.filename} - {self.records_processed} records"
+
+    @property
+    def rows_per_second(self):
+        if not self.started_at or not self.rows_processed:
+            return None
+        elapsed = ((self.completed_at or timezone.now()) - self.started_at).total_seconds()
+        return self.rows_processed / elapsed if elapsed > 0 else None
+
+    @property
+    def eta_seconds(self):
+        if self.status != IngestionStatus.RUNNING.value or self.rows_total is None or not self.rows_per_second:
+            return None
+        return max(self.rows_total - self.rows_processed, 0) / self.rows_per_second
+
+    def refresh_progress(self, interval=0):
+        """
+        Roll the checkpoint counters up into the log with a single UPDATE.
+
+        Nothing is written if the progress was refreshed less than ``interval`` seconds ago, which keeps
+        parallel chunks from writing the log on every batch.
+        """
+        logs = IngestionLog.objects.filter(pk=self.pk)
+        if interval:
+            logs = logs.filter(
+                Q(progress_updated_at__isnull=True)
+                | Q(progress_updated_at__lt=timezone.now() - timedelta(seconds=interval))
+            )
+
+        checkpoints = IngestionCheckpoint.objects.filter(log=OuterRef("pk")).values("log")
+
+        def total(expression):
+            return Coalesce(Subquery(checkpoints.annotate(total=Sum(expression)).values("total")), 0)
+
+        logs.update(
+            rows_processed=total("rows_processed"),
+            rows_inserted=total("rows_inserted"),
+            rows_skipped=total("rows_skipped"),
+            rows_failed=total(F("rows_processed") - F("rows_inserted") - F("rows_skipped")),
+            progress_updated_at=timezone.now(),
+        )
+
+
+class IngestionCheckpoint(models.Model):
+    """Progress of one chunk of an ingestion, committed together with each batch so it can be resumed."""
+    log = models.ForeignKey(IngestionLog, on_delete=models.CASCADE, related_name="checkpoints")
+    chunk = models.IntegerField()
+    offset = models.BigIntegerField(null=True, blank=True)  # Byte offset right after the last committed row
+    rows_processed = models.IntegerField(default=0)
+    rows_inserted = models.IntegerField(default=0)
+    rows_skipped = models.IntegerField(default=0)
+    errors = models.JSONField(default=list)  # [row_number, message] pairs
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["log", "chunk"], name="unique_ingestion_checkpoint")]
+
+    def __str__(self):
+        return f"{self.log} - chunk {self.chunk} ({self.rows_processed} rows)"
+
+    @property
+    def state(self):
+        return {
+            "offset": self.offset,
+            "processed": self.rows_processed,
+            "inserted": self.rows_inserted,
+            "skipped": self.rows_skipped,
+            "errors": self.errors,
+        }
+
+    def save_state(self, state, completed=False, progress_interval=0):
+        """Save an ingestor state and roll it up into the log, throttled to ``progress_interval`` seconds."""
+        self.offset = state["offset"]
+        self.rows_processed = state["processed"]
+        self.rows_inserted = state["inserted"]
+        self.rows_skipped = state["skipped"]
+        self.errors = state["errors"]
+        self.completed = completed
+        self.save()
+
+        self.log.refresh_progress(interval=progress_interval)
@@ -0,0 +1,262 @@
+import base64
+import binascii
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .cache import book_cache, catalog_version
+
+
+COUNT_EXACT = 'exact'
+COUNT_ESTIMATE = 'estimate'
+COUNT_NONE = 'none'
+
+
+def cached_count(queryset):
+    """Exact count of ``queryset``, cached until the catalog version changes."""
+    query = hashlib.sha1(str(queryset.query).encode()).hexdigest()
+    return book_cache().get_or_set(f'books:{catalog_version()}:count:{query}', queryset.count)
+
+
+def estimate_count(queryset):
+    """Number of rows of ``queryset`` according to the PostgreSQL planner, without running it."""
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Plan Rows']
+
+
+class BookPagination(PageNumberPagination):
+    """
+    Page number pagination, switching to keyset pagination when the client sends a ``cursor`` parameter.
+
+    Pages are read with one extra row to know whether a next page exists, so the total ``count`` does not
+    decide the page links and can be cheaper than a COUNT of the filtered books. The unfiltered catalogue
+    count is cached until the catalog version changes. Filtered listings that the planner expects to be
+    larger than ``BOOK_COUNT_ESTIMATE_THRESHOLD`` report its estimate. ``?count=false`` skips the count.
+    ``count_type`` tells which one the response carries: ``exact``, ``estimate`` or ``none``.
+
+    An empty ``cursor`` returns the first page and every page links to the next one. Instead of skipping
+    rows with OFFSET, a page starts right after the ``(ordering field, id)`` of the last row of the previous
+    page, so deep pages cost as much as the first one and no COUNT is run. Cursor pages only link forward,
+    as the book list scrolls on: they carry no ``count``, ``previous`` is always null and clients going
+    back reuse the cursors they followed. Rows without a value for the ordering field come last in
+    ascending order and first in descending order, like PostgreSQL sorts them, and ``id`` breaks ties in
+    the direction of the ordering so each page is an index range scan.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    count_query_param = 'count'
+
+    keyset = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            # Break ties so rows with the same value do not move between pages
+            return self._paginate_pages(queryset.order_by(*queryset.query.order_by, 'pk'), request)
+
+        page_size = self.get_page_size(request)
+        field, descending = self._get_ordering(queryset)
+        sections = self._get_sections(queryset, field, descending)
+        position = self._decode_cursor(request)
+        if position is not None and (position[1] is None) == self._is_value_section(position[0], descending):
+            raise NotFound(self.invalid_cursor_message)
+
+        rows = []
+        for index, section in enumerate(sections):
+            if position is not None and index < position[0]:
+                continue
+            if position is not None and index == position[0]:
+                section = self._after(section, field if self._is_value_section(index, descending) else None, position)
+            rows.extend(section[:page_size + 1 - len(rows)])
+            if len(rows) > page_size:
+                break
+
+        self.page = rows[:page_size]
+        self.next_position = None
+        if len(rows) > page_size:
+            last = self.page[-1]
+            # Pages of the book list are values() rows
+            value, pk = (last[field], last['pk']) if isinstance(last, dict) else (getattr(last, field), last.pk)
+            self.next_position = [self._section_of(value, descending), value, pk]
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return Response({
+                'count': self.count,
+                'count_type': self.count_type,
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link(),
+                'results': data,
+            })
+
+        return Response({
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count']['nullable'] = True
+        response_schema['properties']['count_type'] = {
+            'type': 'string',
+            'enum': [COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE],
+        }
+        return response_schema
+
+    def get_next_link(self):
+        if not self.keyset:
+            if not self.has_next:
+                return None
+            url = self.request.build_absolute_uri()
+            return replace_query_param(url, self.page_query_param, self.page_number + 1)
+        if self.next_position is None:
+            return None
+
+        cursor = base64.urlsafe_b64encode(json.dumps(self.next_position).encode()).decode()
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_previous_link(self):
+        if self.keyset or self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+    def _paginate_pages(self, queryset, request):
+        page_size = self.get_page_size(request)
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            self.page_number = 0
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message)
+
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and self.page_number > 1:
+            raise NotFound(self.invalid_page_message)
+
+        self.page = rows[:page_size]
+        self.has_next = len(rows) > page_size
+        if not self.has_next:
+            # The last page tells the exact count for free
+            self.count, self.count_type = offset + len(self.page), COUNT_EXACT
+        else:
+            self.count, self.count_type = self._get_count(queryset, request)
+        return self.page
+
+    def _get_count(self, queryset, request):
+        if request.query_params.get(self.count_query_param, '').lower() in ('false', '0', 'no', 'none'):
+            return None, COUNT_NONE
+        if not queryset.query.where:
+            return cached_count(queryset), COUNT_EXACT
+        if connection.vendor == 'postgresql':
+            estimate = estimate_count(queryset)
+            if estimate >= settings.BOOK_COUNT_ESTIMATE_THRESHOLD:
+                return estimate, COUNT_ESTIMATE
+        return queryset.count(), COUNT_EXACT
+
+    def _get_ordering(self, queryset):
+        ordering = queryset.query.order_by
+        if len(ordering) != 1 or not isinstance(ordering[0], str) or '__' in ordering[0]:
+            raise ValidationError({
+                'ordering': 'Cursor pagination supports ordering by a single field.'
+            })
+
+        field = ordering[0].lstrip('-')
+        if field not in queryset.query.annotations:
+            try:
+                queryset.model._meta.get_field(field)
+            except FieldDoesNotExist:
+                raise ValidationError({
+                    'ordering': 'Cursor pagination supports ordering by a single field.'
+                })
+        return field, ordering[0].startswith('-')
+
+    def _get_sections(self, queryset, field, descending):
+        """The rows with and without a value for ``field``, in the order they are paginated."""
+        nulls = queryset.none()
+        if field not in queryset.query.annotations and queryset.model._meta.get_field(field).null:
+            nulls = queryset.filter(**{
+                f'{field}__isnull': True
+            })
+
+        if descending:
+            values = queryset.filter(**{
+                f'{field}__isnull': False
+            }).order_by(f'-{field}', '-pk')
+            return [nulls.order_by('-pk'), values]
+
+        values = queryset.filter(**{
+            f'{field}__isnull': False
+        }).order_by(field, 'pk')
+        return [values, nulls.order_by('pk')]
+
+    @staticmethod
+    def _is_value_section(index, descending):
+        return index == (1 if descending else 0)
+
+    @staticmethod
+    def _section_of(value, descending):
+        return int((value is None) != descending)
+
+    def _after(self, section, field, position):
+        """Rows of ``section`` that come after the cursor ``position``."""
+        _, value, pk = position
+        descending = section.query.order_by[-1].startswith('-')
+        if field is None:
+            return section.filter(**{
+                'pk__lt' if descending else 'pk__gt': pk
+            })
+
+        if field in section.query.annotations:
+            # Computed values such as the search rank are not indexed, so plain lookups do as well
+            lookup = 'lt' if descending else 'gt'
+            return section.filter(Q(**{
+                f'{field}__{lookup}': value
+            }) | Q(**{
+                field: value,
+                f'pk__{lookup}': pk
+            }))
+
+        # A row comparison lets the database seek into the (field, id) index
+        model = section.model
+        quote = connection.ops.quote_name
+        table = quote(model._meta.db_table)
+        column = quote(model._meta.get_field(field).column)
+        pk_column = quote(model._meta.pk.column)
+        operator = '<' if descending else '>'
+        return section.extra(where=[f'({table}.{column}, {table}.{pk_column}) {operator} (%s, %s)'], params=[value, pk])
+
+    def _decode_cursor(self, request):
+        encoded = request.query_params[self.cursor_query_param]
+        if not encoded:
+            return None
+
+        try:
+            section, value, pk = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except (TypeError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        if section not in (0, 1) or not isinstance(pk, int):
+            raise NotFound(self.invalid_cursor_message)
+        return section, value, pk
@@ -0,0 +1,80 @@
+import re
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, FloatField, OuterRef, Subquery
+from django.db.models.functions import Cast
+
+from .models import Author, Book
+
+
+SEARCH_CONFIG = "simple"  # No stemming: titles come in many languages and author names should match as typed
+
+ISBN_PATTERN = re.compile(r"^(?:\d{9}[\dX]|\d{13})$")
+
+
+def search_vector_enabled():
+    return connection.vendor == "postgresql"
+
+
+def book_search_vector():
+    """Weighted tsvector of a book: title and author names first, then the original title and the ISBNs."""
+    author_names = Author.objects.filter(books=OuterRef("pk")).values("books")
+    author_names = author_names.annotate(names=StringAgg("name", " ")).values("names")
+
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG) +
+        SearchVector(Subquery(author_names), weight="B", config=SEARCH_CONFIG) +
+        SearchVector("original_title", weight="C", config=SEARCH_CONFIG) +
+        SearchVector("isbn", "isbn13", weight="D", config=SEARCH_CONFIG)
+    )
+
+
+def refresh_search_vectors(book_ids):
+    """Recompute the search vector of the given books with a single UPDATE."""
+    book_ids = list(book_ids)
+    if book_ids and search_vector_enabled():
+        Book.objects.filter(pk__in=book_ids).update(search_vector=book_search_vector())
+
+
+def normalize_isbn(term):
+    """Return ``term`` as a bare ISBN-10 or ISBN-13, or ``None`` if it does not look like one."""
+    isbn = re.sub(r"[\s-]", "", term).upper()
+    return isbn if ISBN_PATTERN.match(isbn) else None
+
+
+def search_query(term):
+    """
+    Prefix query matching every word of ``term``, so results show up while the last word is still typed.
+
+    Returns ``None`` when ``term`` has no word to search for.
+    """
+    words = re.findall(r"\w+", term.lower())
+    if not words:
+        return None
+    return SearchQuery(" & ".join(f"{word}:*" for word in words), search_type="raw", config=SEARCH_CONFIG)
+
+
+def search_books(queryset, term):
+    """
+    Filter ``queryset`` down to the books matching ``term``, annotated with their ``rank``.
+
+    A term shaped like an ISBN is first looked up in the unique isbn and isbn13 indexes. Other terms, or
+    ISBNs that match nothing, go through the GIN index on the search vector.
+    """
+    isbn = normalize_isbn(term)
+    if isbn is not None:
+        books = queryset.filter(**{
+            "isbn13" if len(isbn) == 13 else "isbn": isbn
+        })
+        if books.exists():
+            return books
+
+    query = search_query(term)
+    if query is None:
+        return queryset.none()
+
+    # Cast to double precision so ranks survive the round trip through keyset pagination cursors
+    rank = Cast(SearchRank(F("search_vector"), query), FloatField())
+    return queryset.filter(search_vector=query).annotate(rank=rank)
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from .models import Author, Book, IngestionLog, normalize_name
+from .models import Author, Book, IngestionLog, Suggestion, normalize_name
 
 
 class AuthorSerializer(serializers.ModelSerializer):
@@ -13,17 +13,19 @@ class AuthorSerializer(serializers.ModelSerializer):
 class BookSerializer(serializers.ModelSerializer):
     authors = AuthorSerializer(many=True, read_only=True)
     authors_input = serializers.CharField(write_only=True)
-    reserved = serializers.SerializerMethodField()
+    reserved = serializers.BooleanField(source='is_reserved', read_only=True)
 
     class Meta:
         model = Book
-        fields = '__all__'
+        exclude = ['search_vector', 'is_reserved']
 
-    def get_reserved(self, obj):
-        reserved = obj.reservations.filter(status='reserved').first()
-        if reserved:
-            return True
-        return False
+    def __init__(self, *args, fields=None, **kwargs):
+        """``fields`` restricts the output to the given field names, see books.fieldsets."""
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                if not self.fields[name].write_only:
+                    self.fields.pop(name)
 
     def create(self, validated_data):
         authors_input = validated_data.pop('authors_input', '')
@@ -53,13 +55,35 @@ class BookSerializer(serializers.ModelSerializer):
         book.authors.set(authors)
 
 
+class SuggestionSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Suggestion
+        fields = ['text', 'kind']
+
+
 class IngestionLogSerializer(serializers.ModelSerializer):
+    rows_per_second = serializers.FloatField(read_only=True)
+    eta_seconds = serializers.FloatField(read_only=True)
 
     class Meta:
         model = IngestionLog
         fields = '__all__'
 
 
+class IngestionProgressSerializer(serializers.ModelSerializer):
+    """Compact view of an ingestion job, meant to be polled while it runs."""
+    rows_per_second = serializers.FloatField(read_only=True)
+    eta_seconds = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = IngestionLog
+        fields = [
+            'id', 'filename', 'status', 'rows_total', 'rows_processed', 'rows_inserted', 'rows_skipped', 'rows_failed',
+            'rows_per_second', 'eta_seconds', 'started_at', 'progress_updated_at', 'completed_at'
+        ]
+
+
 class CSVUploadSerializer(serializers.Serializer):
     """Serializer for handling CSV file uploads."""
     file = serializers.FileField()
@@ -0,0 +1,85 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_catalog_version
+from .models import Author, Book
+from .search import refresh_search_vectors
+from .suggestions import refresh_suggestions
+
+
+def _author_keys(book):
+    return set(book.authors.values_list("normalized_name", flat=True))
+
+
+@receiver(pre_save, sender=Book)
+def remember_book_title(sender, instance, raw=False, **kwargs):
+    if not raw and instance.pk is not None:
+        instance._previous_title = Book.objects.filter(pk=instance.pk).values_list("title", flat=True).first()
+
+
+@receiver(post_save, sender=Book)
+def refresh_book_search_data(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    refresh_search_vectors([instance.pk])
+    titles = {instance.title, instance.__dict__.pop("_previous_title", None)} - {None}
+    refresh_suggestions(titles=titles, author_keys=_author_keys(instance))
+
+
+@receiver(pre_delete, sender=Book)
+def remember_book_authors(sender, instance, **kwargs):
+    instance._deleted_author_keys = _author_keys(instance)
+
+
+@receiver(post_delete, sender=Book)
+def refresh_deleted_book_suggestions(sender, instance, **kwargs):
+    refresh_suggestions(titles={instance.title}, author_keys=instance.__dict__.pop("_deleted_author_keys", ()))
+
+
+@receiver(m2m_changed, sender=Book.authors.through)
+def refresh_search_data_on_authors_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        # post_clear does not tell which links were removed
+        instance._cleared_pks = set(
+            instance.books.values_list("pk", flat=True) if reverse else instance.authors.values_list("pk", flat=True)
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if action == "post_clear":
+        pk_set = instance.__dict__.pop("_cleared_pks", set())
+
+    if reverse:
+        refresh_search_vectors(pk_set)
+        refresh_suggestions(author_keys={instance.normalized_name})
+    else:
+        refresh_search_vectors([instance.pk])
+        author_keys = Author.objects.filter(pk__in=pk_set).values_list("normalized_name", flat=True)
+        refresh_suggestions(author_keys=set(author_keys))
+
+
+@receiver(pre_save, sender=Author)
+def remember_author_key(sender, instance, raw=False, **kwargs):
+    if not raw and instance.pk is not None:
+        instance._previous_key = Author.objects.filter(pk=instance.pk).values_list("normalized_name", flat=True).first()
+
+
+@receiver(post_save, sender=Author)
+def refresh_author_search_data(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+
+    refresh_search_vectors(instance.books.values_list("pk", flat=True))
+    keys = {instance.normalized_name, instance.__dict__.pop("_previous_key", None)} - {None}
+    refresh_suggestions(author_keys=keys)
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+@receiver(m2m_changed, sender=Book.authors.through)
+def invalidate_book_cache(sender, **kwargs):
+    bump_catalog_version()
@@ -0,0 +1,6 @@
+from django.core.files.storage import storages
+
+
+def csv_upload_storage():
+    """Return the storage backend uploaded CSV files are spooled to before ingestion."""
+    return storages["csv_uploads"]
@@ -0,0 +1,86 @@
+from django.db.models import Max, Min, Sum, Value
+from django.db.models.functions import Coalesce, Upper
+
+from .models import Author, Book, Suggestion
+from .utils import normalize_name
+
+
+SUGGESTION_LIMIT = 10
+MAX_SUGGESTION_LIMIT = 25
+
+
+def suggest(prefix, limit=SUGGESTION_LIMIT):
+    """Top title and author completions of ``prefix``, by ratings count."""
+    key = normalize_name(prefix)
+    if not key:
+        return []
+    return list(Suggestion.objects.filter(key__startswith=key).order_by("-weight", "key")[:limit])
+
+
+def _title_suggestions(titles):
+    # Both sides go through the database UPPER, which differs from str.upper() on non-ASCII text
+    upper_titles = [Upper(Value(title.strip())) for title in titles if title and title.strip()]
+    if not upper_titles:
+        return {}
+
+    suggestions = {}
+    books = Book.objects.annotate(upper_title=Upper("title")).filter(upper_title__in=upper_titles)
+    books = books.values("upper_title").annotate(text=Min("title"), weight=Coalesce(Max("ratings_count"), 0))
+    for book in books:
+        key = normalize_name(book["text"])
+        if key and (key not in suggestions or book["weight"] > suggestions[key].weight):
+            suggestions[key] = Suggestion(kind=Suggestion.TITLE, key=key, text=book["text"], weight=book["weight"])
+    return suggestions
+
+
+def _author_suggestions(author_keys):
+    if not author_keys:
+        return {}
+
+    authors = Author.objects.filter(normalized_name__in=author_keys, books__isnull=False)
+    authors = authors.values("normalized_name", "name").annotate(weight=Coalesce(Sum("books__ratings_count"), 0))
+    return {
+        author["normalized_name"]:
+            Suggestion(
+                kind=Suggestion.AUTHOR, key=author["normalized_name"], text=author["name"], weight=author["weight"]
+            )
+        for author in authors if author["normalized_name"]
+    }
+
+
+def _save(kind, keys, suggestions):
+    Suggestion.objects.bulk_create(
+        suggestions.values(), update_conflicts=True, unique_fields=["kind", "key"], update_fields=["text", "weight"]
+    )
+    stale = set(keys) - set(suggestions)
+    if stale:
+        Suggestion.objects.filter(kind=kind, key__in=stale).delete()
+
+
+def refresh_suggestions(titles=(), author_keys=()):
+    """
+    Recompute the suggestions of the given book titles and author normalized names.
+
+    Titles and authors without any book left are removed. Each kind costs one aggregate query and one
+    upsert, so ingestion batches can refresh all their titles and authors at once.
+    """
+    titles = set(titles)
+    author_keys = set(author_keys)
+
+    if titles:
+        _save(Suggestion.TITLE, set(normalize_name(title) for title in titles if title), _title_suggestions(titles))
+    if author_keys:
+        _save(Suggestion.AUTHOR, author_keys, _author_suggestions(author_keys))
+
+
+def rebuild_suggestions(batch_size=5000):
+    """Rebuild every suggestion from the catalogue, in batches of ``batch_size`` titles and authors."""
+    Suggestion.objects.all().delete()
+
+    titles = Book.objects.order_by("title").values_list("title", flat=True).distinct()
+    for start in range(0, titles.count(), batch_size):
+        refresh_suggestions(titles=titles[start:start + batch_size])
+
+    author_keys = Author.objects.order_by("normalized_name").values_list("normalized_name", flat=True)
+    for start in range(0, author_keys.count(), batch_size):
+        refresh_suggestions(author_keys=author_keys[start:start + batch_size])
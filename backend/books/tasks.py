@@ -1,98 +1,125 @@
-import csv
-import io
-
-from celery import shared_task
-from django.db import transaction
+from celery import chord, shared_task
+from django.conf import settings
+from django.db import OperationalError, transaction
+from django.utils import timezone
 
+from .cache import bump_catalog_version
 from .emails import send_ingestion_report
-from .models import Author, Book, IngestionLog
-from .utils import book_exists, clean_isbn, normalize_name
+from .enums import IngestionStatus
+from .ingestion import ingest_file, plan_chunks
+from .models import IngestionCheckpoint, IngestionLog
+from .storage import csv_upload_storage
+
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def process_csv(file_name, admin_email, filename):
+    """
+    Process an uploaded CSV file in batches; a failing row is reported without blocking the rest of its batch.
+
+    ``file_name`` is the name the upload was saved under in the CSV upload storage. Files larger than
+    ``CSV_INGESTION_CHUNK_SIZE`` rows are split into chunks that run in parallel as a chord, in which case
+    :func:`finalize_ingestion` writes the log and sends the report once every chunk is done.
+
+    Progress is checkpointed on the IngestionLog of the file, so a task re-queued after a worker was lost
+    resumes from the last committed batch instead of starting over. The log moves from ``queued`` to
+    ``running`` once the file is planned, and to ``done`` or ``failed`` when the ingestion ends. The chord
+    is sent once per log, so a redelivery after it was sent leaves the ingestion to the chunk tasks.
+    """
+    try:
+        log, _ = IngestionLog.objects.get_or_create(source=file_name, defaults={
+            "filename": filename
+        })
+        if log.completed_at is not None or log.chunks_dispatched_at is not None:
+            return  # Already ingested or handed to the chunk tasks; the task was delivered again
+
+        storage = csv_upload_storage()
+
+        with storage.open(file_name, "rb") as file:
+            chunks = plan_chunks(file, settings.CSV_INGESTION_CHUNK_SIZE)
+
+            log.status = IngestionStatus.RUNNING.value
+            log.rows_total = sum(chunk[3] for chunk in chunks)
+            log.started_at = log.started_at or timezone.now()
+            log.save(update_fields=["status", "rows_total", "started_at"])
+
+            if len(chunks) <= 1:
+                checkpoint, _ = IngestionCheckpoint.objects.get_or_create(log=log, chunk=0)
+                ingestor = ingest_file(file, chunks[0] if chunks else None, checkpoint=checkpoint)
+                return finalize_ingestion([ingestor.state()], log.pk, admin_email)
+
+        with transaction.atomic():
+            # Claimed in the transaction sending the chord, so a concurrent delivery waits and then backs off
+            claimed = IngestionLog.objects.filter(pk=log.pk, chunks_dispatched_at__isnull=True).update(
+                chunks_dispatched_at=timezone.now()
+            )
+            if not claimed:
+                return
+            header = [ingest_csv_chunk.s(file_name, chunk, log.pk, index) for index, chunk in enumerate(chunks)]
+            chord(header)(finalize_ingestion.s(log.pk, admin_email))
 
+    except Exception as e:
+        IngestionLog.objects.filter(source=file_name).update(status=IngestionStatus.FAILED.value)
+        return 0, "Critical error: " + str(e)
 
-@shared_task
-def process_csv(file_data, admin_email, filename):
-    """Process CSV file where each row is handled independently to prevent blocking on failure."""
-    books_processed = 0
-    books_inserted = 0
-    books_skipped = 0
-    errors = []
 
-    try:
-        decoded_file = file_data.decode("utf-8")
-        csv_reader = csv.DictReader(io.StringIO(decoded_file))
-
-        for row in csv_reader:
-            try:
-                with transaction.atomic():
-                    books_processed += 1
-
-                    if book_exists(row):
-                        books_skipped += 1
-                        continue
-
-                    authors_list = [name.strip() for name in row["authors"].split(",")]
-                    author_instances = []
-
-                    for author_name in authors_list:
-                        normalized_name = normalize_name(author_name)
-
-                        author = None
-                        if normalized_name:
-                            author = Author.objects.filter(normalized_name=normalized_name).first()
-                            if author:
-                                author_instances.append(author)
-
-                        if not author:
-                            author, _ = Author.objects.get_or_create(name=author_name)
-                            author.normalized_name = normalize_name(author.name)
-                            author.save()
-                            author_instances.append(author)
-
-                    book = Book.objects.create(
-                        isbn13=clean_isbn(row.get("isbn13", "")),
-                        isbn=clean_isbn(row.get("isbn", "")),
-                        goodreads_book_id=int(float(row["goodreads_book_id"]))
-                        if row.get("goodreads_book_id") else None,
-                        best_book_id=int(float(row["best_book_id"])) if row.get("best_book_id") else None,
-                        work_id=int(float(row["work_id"])) if row.get("work_id") else None,
-                        books_count=int(float(row["books_count"])) if row.get("books_count") else 1,
-                        original_publication_year=int(float(row["original_publication_year"]))
-                        if row.get("original_publication_year") else None,
-                        title=row.get("title", "").strip() or None,
-                        original_title=row.get("original_title", "").strip() or None,
-                        language_code=row.get("language_code", "").strip() or None,
-                        average_rating=float(row["average_rating"]) if row.get("average_rating") else None,
-                        ratings_count=int(float(row["ratings_count"])) if row.get("ratings_count") else None,
-                        image_url=row.get("image_url", "").strip() or None,
-                        small_image_url=row.get("small_image_url", "").strip() or None,
-                        ratings_1=int(float(row["ratings_1"])) if row.get("ratings_1") else None,
-                        ratings_2=int(float(row["ratings_2"])) if row.get("ratings_2") else None,
-                        ratings_3=int(float(row["ratings_3"])) if row.get("ratings_3") else None,
-                        ratings_4=int(float(row["ratings_4"])) if row.get("ratings_4") else None,
-                        ratings_5=int(float(row["ratings_5"])) if row.get("ratings_5") else None,
-                        work_ratings_count=int(float(row["work_ratings_count"]))
-                        if row.get("work_ratings_count") else None,
-                        work_text_reviews_count=int(float(row["work_text_reviews_count"]))
-                        if row.get("work_text_reviews_count") else None,
-                    )
-
-                    book.authors.set(author_instances)
-                    books_inserted += 1
-
-            except Exception as e:
-                errors.append(f"Error processing book '{row.get('title', 'Unknown')}': {str(e)}")
-                continue
-
-        IngestionLog.objects.create(
-            filename=filename,
-            records_processed=books_inserted,
-            errors="; ".join(errors) if errors else None,
-        )
-
-        send_ingestion_report(books_processed, books_inserted, books_skipped, errors, filename, admin_email)
-
-        return books_inserted, books_skipped, errors
+@shared_task(
+    acks_late=True, reject_on_worker_lost=True, autoretry_for=(OperationalError, ), retry_backoff=True, max_retries=3
+)
+def ingest_csv_chunk(file_name, chunk, log_id, index):
+    """Ingest one ``(start, end, first_row, rows)`` chunk of an uploaded CSV file, resuming from its checkpoint."""
+    checkpoint, _ = IngestionCheckpoint.objects.get_or_create(log_id=log_id, chunk=index)
+    if checkpoint.completed:
+        return checkpoint.state
 
+    try:
+        with csv_upload_storage().open(file_name, "rb") as file:
+            ingestor = ingest_file(file, chunk, checkpoint=checkpoint)
+    except OperationalError:
+        raise
     except Exception as e:
-        errors.append(str(e))
-        return 0, "Critical error: " + str(e)
+        # Report the failure instead of raising, so the chord callback still runs
+        state = checkpoint.state
+        return {
+            **state,
+            "errors": [*state["errors"], (chunk[2] + state["processed"], "Critical error: " + str(e))],
+        }
+
+    return ingestor.state()
+
+
+@shared_task
+def finalize_ingestion(results, log_id, admin_email):
+    """
+    Merge the chunk results into the IngestionLog and send a single email report.
+
+    The log is ``failed`` when a chunk stopped on a critical error and left its checkpoint incomplete,
+    with the rows it never reached counted as failed.
+    """
+    books_processed = sum(result["processed"] for result in results)
+    books_inserted = sum(result["inserted"] for result in results)
+    books_skipped = sum(result["skipped"] for result in results)
+    errors = [message for _, message in sorted(tuple(error) for result in results for error in result["errors"])]
+
+    with transaction.atomic():
+        log = IngestionLog.objects.select_for_update().get(pk=log_id)
+        if log.completed_at is not None:
+            return  # Another delivery of this callback already reported the ingestion
+
+        incomplete = log.checkpoints.filter(completed=False).exists()
+        unprocessed = max((log.rows_total or 0) - books_processed, 0) if incomplete else 0
+
+        log.status = IngestionStatus.FAILED.value if incomplete else IngestionStatus.DONE.value
+        log.records_processed = books_inserted
+        log.rows_processed = books_processed
+        log.rows_inserted = books_inserted
+        log.rows_skipped = books_skipped
+        log.rows_failed = books_processed - books_inserted - books_skipped + unprocessed
+        log.errors = "; ".join(errors) if errors else None
+        log.completed_at = log.progress_updated_at = timezone.now()
+        log.save()
+        bump_catalog_version()
+
+    send_ingestion_report(books_processed, books_inserted, books_skipped, errors, log.filename, admin_email)
+    csv_upload_storage().delete(log.source)
+
+    return books_inserted, books_skipped, errors
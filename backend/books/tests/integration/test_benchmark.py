@@ -0,0 +1,23 @@
+import tempfile
+
+from books.benchmark import generate_books_csv, measure_ingestion
+from books.models import Book
+from django.test import TestCase
+
+
+class MeasureIngestionTests(TestCase):
+
+    def test_measure_ingestion(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            generate_books_csv(file, 50, duplicate_rate=0.1, error_rate=0)
+            file.flush()
+
+            report = measure_ingestion(file.name, trace_memory=True)
+
+        self.assertEqual(report["status"], "done")
+        self.assertEqual(report["rows"], 50)
+        self.assertEqual(report["inserted"] + report["skipped"] + report["failed"], 50)
+        self.assertEqual(report["inserted"], Book.objects.count())
+        self.assertGreater(report["rows_per_second"], 0)
+        self.assertGreater(report["queries"], 0)
+        self.assertGreater(report["peak_memory_kb"], 0)
@@ -1,5 +1,8 @@
 from books.models import Author, Book
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from reservations.models import Reservation
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
@@ -25,6 +28,63 @@ class BookViewSetTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data.get('results')), 1)
 
+    def test_book_list_reserved_flag(self):
+        Reservation.objects.create(book=self.book, status='reserved', name="Test User", email="test@example.com")
+        Book.objects.create(title="Free Book", isbn="9780321766")
+
+        response = self.client.get(reverse("book-list"))
+
+        reserved = {
+            book["title"]: book["reserved"]
+            for book in response.data["results"]
+        }
+        self.assertEqual(reserved, {
+            "Test Book": True,
+            "Free Book": False
+        })
+
+    def test_book_list_reserved_filter_reads_stored_state(self):
+        Reservation.objects.create(book=self.book, status='reserved', name="Test User", email="test@example.com")
+        Book.objects.create(title="Free Book", isbn="9780321766")
+
+        for value, titles in (("true", ["Test Book"]), ("false", ["Free Book"])):
+            with self.subTest(reserved=value), CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse("book-list"), {
+                    "reserved": value
+                })
+            self.assertEqual([book["title"] for book in response.data["results"]], titles)
+            self.assertFalse(any("reservations_reservation" in query["sql"] for query in queries.captured_queries[1:]))
+
+    def test_book_list_query_count_does_not_depend_on_page_size(self):
+        for index in range(12):
+            book = Book.objects.create(title=f"Book {index}", isbn=f"isbn-{index}")
+            book.authors.set([self.author, Author.objects.create(name=f"Author {index}")])
+            Reservation.objects.create(book=book, status='reserved', name="Test User", email="test@example.com")
+
+        url = reverse("book-list")
+
+        # Validators, count, page of books with the reserved flag, prefetched authors
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data["results"]), 10)
+
+        # The last page gives the count away
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {
+                "page": 2
+            })
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_book_retrieve_query_count(self):
+        # Validators, book with the reserved flag, authors
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("book-detail", kwargs={
+                "pk": self.book.pk
+            }))
+        self.assertEqual(response.data["authors"], [{
+            "name": "Test Author"
+        }])
+
     def test_book_retrieve(self):
         url = reverse("book-detail", kwargs={
             "pk": self.book.pk
@@ -0,0 +1,135 @@
+from books.cache import catalog_version
+from books.models import Author, Book, IngestionLog
+from books.tasks import finalize_ingestion
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from reservations.models import Reservation
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+
+class BookResponseCacheTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = Author.objects.create(name="Test Author", normalized_name="test author")
+        self.book = Book.objects.create(title="Test Book", isbn="9780321765")
+        self.book.authors.set([self.author])
+
+    def test_list_is_served_from_cache(self):
+        url = reverse("book-list")
+        first = self.client.get(url, {
+            "ordering": "title"
+        })
+
+        with self.assertNumQueries(1):  # Conditional GET validators
+            second = self.client.get(url, {
+                "ordering": "title"
+            })
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data, first.data)
+
+    def test_retrieve_is_served_from_cache(self):
+        url = reverse("book-detail", kwargs={
+            "pk": self.book.pk
+        })
+        self.client.get(url)
+
+        with self.assertNumQueries(1):  # Conditional GET validators
+            response = self.client.get(url)
+        self.assertEqual(response.data["title"], "Test Book")
+
+    def test_query_params_are_normalized(self):
+        url = reverse("book-list")
+        self.client.get(url + "?ordering=title&search=test")
+
+        with self.assertNumQueries(1):  # Conditional GET validators
+            self.client.get(url + "?search=test%20&reserved=&ordering=title")
+
+    def test_different_params_are_cached_separately(self):
+        url = reverse("book-list")
+        Book.objects.create(title="Other Book", isbn="9780321766")
+        self.client.get(url, {
+            "ordering": "title"
+        })
+
+        response = self.client.get(url, {
+            "ordering": "-title"
+        })
+        self.assertEqual([book["title"] for book in response.data["results"]], ["Test Book", "Other Book"])
+
+    def test_book_write_invalidates_cache(self):
+        url = reverse("book-detail", kwargs={
+            "pk": self.book.pk
+        })
+        self.client.get(url)
+
+        self.book.title = "Renamed Book"
+        self.book.save()
+
+        self.assertEqual(self.client.get(url).data["title"], "Renamed Book")
+
+    def test_author_write_invalidates_cache(self):
+        url = reverse("book-detail", kwargs={
+            "pk": self.book.pk
+        })
+        self.client.get(url)
+
+        self.author.name = "Renamed Author"
+        self.author.save()
+
+        self.assertEqual(self.client.get(url).data["authors"], [{
+            "name": "Renamed Author"
+        }])
+
+    def test_reservation_write_invalidates_cache(self):
+        url = reverse("book-detail", kwargs={
+            "pk": self.book.pk
+        })
+        self.assertFalse(self.client.get(url).data["reserved"])
+
+        reservation = Reservation.objects.create(book=self.book, name="Test User", email="test@example.com")
+        self.assertTrue(self.client.get(url).data["reserved"])
+
+        reservation.delete()
+        self.assertFalse(self.client.get(url).data["reserved"])
+
+    @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+    def test_completed_ingestion_invalidates_cache(self):
+        log = IngestionLog.objects.create(filename="books.csv", source="missing.csv")
+        version = catalog_version()
+
+        finalize_ingestion([{
+            "processed": 0,
+            "inserted": 0,
+            "skipped": 0,
+            "errors": []
+        }], log.pk, "admin@example.com")
+
+        self.assertNotEqual(catalog_version(), version)
+
+    def test_commit_bumps_version_again(self):
+        version = catalog_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(title="New Book", isbn="9780321767")
+
+        self.assertEqual(catalog_version(), version + 2)
+
+    def test_authenticated_users_bypass_cache(self):
+        url = reverse("book-list")
+        self.client.get(url)
+
+        self.client.force_authenticate(user=User.objects.create_user(username="testuser", password="testpassword"))
+        with self.assertNumQueries(3):
+            self.client.get(url)
+
+    def test_errors_are_not_cached(self):
+        url = reverse("book-detail", kwargs={
+            "pk": self.book.pk + 1
+        })
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        Book.objects.bulk_create([Book(pk=self.book.pk + 1, title="New Book", isbn="9780321767")])  # No signals
+        self.assertEqual(self.client.get(url).status_code, 200)
@@ -0,0 +1,121 @@
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from books.models import Author, Book
+from django.test import TestCase
+from django.utils.http import http_date
+from reservations.models import Reservation
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+
+class BookConditionalGetTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = Author.objects.create(name="Test Author", normalized_name="test author")
+        self.book = Book.objects.create(title="Test Book", isbn="9780321765")
+        self.book.authors.set([self.author])
+        self.detail_url = reverse("book-detail", kwargs={
+            "pk": self.book.pk
+        })
+
+    def test_headers_are_sent(self):
+        for url in (reverse("book-list"), self.detail_url):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response.headers["ETag"].startswith('"'))
+                self.assertIn("Last-Modified", response.headers)
+
+    def test_matching_etag_returns_not_modified_without_serializing(self):
+        etag = self.client.get(self.detail_url).headers["ETag"]
+
+        # Only the validators query runs
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_list_matching_etag_returns_not_modified(self):
+        url = reverse("book-list")
+        etag = self.client.get(url, {
+            "ordering": "title"
+        }).headers["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {
+                "ordering": "title"
+            }, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(url, {
+            "ordering": "-title"
+        }, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.detail_url).headers["Last-Modified"]
+
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        earlier = http_date((self.book.updated_at - timedelta(minutes=1)).timestamp())
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=earlier)
+        self.assertEqual(response.status_code, 200)
+
+    def test_book_update_changes_etag(self):
+        etag = self.client.get(self.detail_url).headers["ETag"]
+
+        # Bypasses the signals, like bulk updates
+        updated_at = self.book.updated_at + timedelta(days=1)
+        Book.objects.filter(pk=self.book.pk).update(title="Renamed Book", updated_at=updated_at)
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["title"], "Renamed Book")
+
+    def test_reservation_changes_etag(self):
+        etag = self.client.get(self.detail_url).headers["ETag"]
+        list_etag = self.client.get(reverse("book-list")).headers["ETag"]
+
+        Reservation.objects.create(book=self.book, name="Test User", email="test@example.com")
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["reserved"])
+        self.assertEqual(self.client.get(reverse("book-list"), HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
+
+    def test_reservation_delete_moves_last_modified(self):
+        reservation = Reservation.objects.create(book=self.book, name="Test User", email="test@example.com")
+        last_modified = self.client.get(self.detail_url).headers["Last-Modified"]
+        time.sleep(1)  # Last-Modified has a resolution of one second
+
+        reservation.delete()
+
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["reserved"])
+
+    def test_list_last_modified_follows_deletions(self):
+        url = reverse("book-list")
+        other = Book.objects.create(title="Other Book", isbn="9780321766")
+        last_modified = self.client.get(url).headers["Last-Modified"]
+
+        later = time.time() + 60
+        with patch("books.cache.time.time", return_value=later):
+            other.delete()
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Last-Modified"], http_date(int(later)))
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(later)).status_code, 304)
+
+    def test_missing_book(self):
+        response = self.client.get(reverse("book-detail", kwargs={
+            "pk": self.book.pk + 1
+        }), HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("ETag", response.headers)
@@ -1,6 +1,8 @@
 from unittest.mock import patch
 
 from books.models import Author, Book, IngestionLog
+from books.storage import csv_upload_storage
+from books.tests.utils import UploadStorageMixin
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase, override_settings
 from rest_framework import status
@@ -9,9 +11,10 @@ from rest_framework.test import APIClient
 
 
 @override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATE=True)
-class CSVUploadViewTests(TestCase):
+class CSVUploadViewTests(UploadStorageMixin, TestCase):
 
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
         self.user = self.create_test_user()
         self.client.force_authenticate(user=self.user)
@@ -20,8 +23,8 @@ class CSVUploadViewTests(TestCase):
         from django.contrib.auth.models import User
         return User.objects.create_user(username='testuser', password='testpassword', email="test@test.com")
 
-    @patch("books.tasks.process_csv")
-    def test_csv_upload_successful(self, mock_send_email, mock_process_csv):
+    @patch("books.views.process_csv")
+    def test_csv_upload_successful(self, mock_process_csv):
         csv_file = SimpleUploadedFile("test.csv", b"title,authors\nTest Book,Test Author")
         url = reverse("upload_csv")  # Correct URL name
 
@@ -32,9 +35,15 @@ class CSVUploadViewTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(response.data["message"], "CSV ingestion started. You will receive an email upon completion.")
 
-        mock_process_csv.delay.assert_called_once_with(
-            b"title,authors\nTest Book,Test Author", self.user.email, csv_file.name
-        )
+        mock_process_csv.delay.assert_called_once()
+        file_name, admin_email, filename = mock_process_csv.delay.call_args.args
+        self.assertEqual((admin_email, filename), (self.user.email, "test.csv"))
+
+        log = IngestionLog.objects.get(pk=response.data["job_id"])
+        self.assertEqual((log.source, log.filename, log.status), (file_name, "test.csv", "queued"))
+
+        with csv_upload_storage().open(file_name, "rb") as stored_file:
+            self.assertEqual(stored_file.read(), b"title,authors\nTest Book,Test Author")
 
     @patch("books.tasks.send_ingestion_report")
     def test_csv_upload_with_errors(self, mock_send_email):
@@ -50,8 +59,9 @@ class CSVUploadViewTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
 
         self.assertEqual(IngestionLog.objects.count(), 1)
-        log = IngestionLog.objects.first()
-        self.assertIn("Error processing book 'Test Book': value too long for type character varying(13)", log.errors)
+        log = IngestionLog.objects.get(pk=response.data["job_id"])
+        self.assertEqual((log.status, log.rows_total, log.rows_processed, log.rows_failed), ("done", 1, 1, 1))
+        self.assertIn("Error processing book 'Test Book': Ensure this value has at most 13 characters", log.errors)
 
         mock_send_email.assert_called_once()
 
@@ -0,0 +1,125 @@
+from books.fieldsets import linked_authors
+from books.models import Author, Book
+from books.serializers import BookSerializer
+from django.db import connection
+from django.db.models import Prefetch
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from reservations.models import Reservation
+from rest_framework.renderers import JSONRenderer
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+
+class BookFieldsetTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        first = Author.objects.create(name="First Author")
+        second = Author.objects.create(name="Second Author")
+        self.book = Book.objects.create(
+            title="Test Book", isbn="9780321765", average_rating=4.25, ratings_count=10, original_publication_year=1999
+        )
+        self.book.authors.set([first, second])
+        Book.objects.create(title="Other Book", isbn="9780321766")
+        Reservation.objects.create(book=self.book, name="Test User", email="test@example.com")
+
+    def test_list_matches_serializer_output(self):
+        response = self.client.get(reverse("book-list"), {
+            "ordering": "title"
+        })
+
+        books = Book.objects.order_by("title").prefetch_related(Prefetch("authors", queryset=linked_authors()))
+        for book in books:
+            book.is_reserved = book.reservations.filter(status="reserved").exists()
+        expected = BookSerializer(books, many=True).data
+
+        # Compare the rendered JSON, as datetimes are only formatted by the serializer
+        self.assertEqual(JSONRenderer().render(response.data["results"]), JSONRenderer().render(expected))
+
+    def test_list_fields(self):
+        response = self.client.get(reverse("book-list"), {
+            "fields": "title,authors,reserved",
+            "ordering": "-title"
+        })
+
+        self.assertEqual(
+            response.data["results"], [
+                {
+                    "authors": [{
+                        "name": "First Author"
+                    }, {
+                        "name": "Second Author"
+                    }],
+                    "title": "Test Book",
+                    "reserved": True
+                },
+                {
+                    "authors": [],
+                    "title": "Other Book",
+                    "reserved": False
+                },
+            ]
+        )
+        self.assertEqual(list(response.data["results"][0]), ["authors", "reserved", "title"])
+
+    def test_list_fields_narrow_columns(self):
+        url = reverse("book-list")
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {
+                "fields": "title,average_rating"
+            })
+
+        page_query = queries.captured_queries[-1]["sql"]
+        self.assertIn('"average_rating"', page_query)
+        self.assertNotIn('"ratings_1"', page_query)
+        self.assertFalse(any("books_book_authors" in query["sql"] for query in queries.captured_queries))
+
+    def test_list_fields_with_cursor_pagination(self):
+        url = reverse("book-list")
+        for index in range(10):
+            Book.objects.create(title=f"Book {index}", isbn=f"isbn-{index}", average_rating=index / 2)
+
+        response = self.client.get(url, {
+            "fields": "title",
+            "ordering": "-average_rating",
+            "cursor": ""
+        })
+        # Books without a rating come first in descending order
+        titles = [book["title"] for book in response.data["results"]]
+        self.assertEqual(titles[:3], ["Other Book", "Book 9", "Test Book"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.data["results"], [{
+            "title": "Book 1"
+        }, {
+            "title": "Book 0"
+        }])
+        self.assertIsNone(response.data["next"])
+
+    def test_retrieve_fields(self):
+        url = reverse("book-detail", kwargs={
+            "pk": self.book.pk
+        })
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {
+                "fields": "id, average_rating,reserved"
+            })
+
+        self.assertEqual(response.data, {
+            "id": self.book.pk,
+            "average_rating": 4.25,
+            "reserved": True
+        })
+        self.assertFalse(any('"ratings_1"' in query["sql"] for query in queries.captured_queries))
+
+    def test_unknown_fields(self):
+        for url in (reverse("book-list"), reverse("book-detail", kwargs={
+            "pk": self.book.pk
+        })):
+            with self.subTest(url=url):
+                response = self.client.get(url, {
+                    "fields": "title,authors_input,search_vector"
+                })
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data["fields"], "Unknown fields: authors_input, search_vector.")
@@ -1,5 +1,8 @@
+from datetime import timedelta
+
 from books.models import IngestionLog
 from django.test import TestCase
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
@@ -31,3 +34,33 @@ class IngestionLogViewSetTests(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["filename"], "test.csv")
+
+    def test_ingestion_log_progress(self):
+        log = IngestionLog.objects.create(
+            filename="big.csv",
+            status="running",
+            rows_total=1000,
+            rows_processed=250,
+            rows_inserted=200,
+            rows_skipped=40,
+            rows_failed=10,
+            started_at=timezone.now() - timedelta(seconds=5),
+        )
+        url = reverse("ingestionlog-progress", kwargs={
+            "pk": log.pk
+        })
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "running")
+        self.assertEqual((response.data["rows_processed"], response.data["rows_failed"]), (250, 10))
+        self.assertAlmostEqual(response.data["rows_per_second"], 50, delta=5)
+        self.assertAlmostEqual(response.data["eta_seconds"], 15, delta=2)
+
+    def test_ingestion_log_progress_requires_authentication(self):
+        log = IngestionLog.objects.first()
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse("ingestionlog-progress", kwargs={
+            "pk": log.pk
+        }))
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
@@ -0,0 +1,182 @@
+from books.models import Author, Book
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from reservations.models import Reservation
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+
+class BookCursorPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(name="Test Author")
+        for index in range(25):
+            # Few distinct values, so pages have to break ties, and every third book has no value
+            book = Book.objects.create(
+                title=f"Book {index % 4}",
+                isbn=f"isbn-{index}",
+                average_rating=None if index % 3 == 0 else 3 + index % 2,
+                ratings_count=None if index % 3 == 1 else index % 5,
+                original_publication_year=None if index % 3 == 2 else 1990 + index % 3,
+            )
+            book.authors.add(author)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("book-list")
+
+    def walk(self, **params):
+        response = self.client.get(self.url, {
+            "cursor": "",
+            **params
+        })
+        ids = []
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            self.assertIsNone(response.data["previous"])  # Cursor pages only link forward
+            ids.extend(book["id"] for book in response.data["results"])
+            if response.data["next"] is None:
+                return ids
+            response = self.client.get(response.data["next"])
+
+    def expected(self, field, descending):
+        books = list(Book.objects.all())
+        with_values = sorted((book for book in books if getattr(book, field) is not None),
+                             key=lambda book: (getattr(book, field), book.pk),
+                             reverse=descending)
+        without_values = sorted((book.pk for book in books if getattr(book, field) is None), reverse=descending)
+        with_values = [book.pk for book in with_values]
+        return without_values + with_values if descending else with_values + without_values
+
+    def test_cursor_pagination_for_each_ordering(self):
+        for field in ("title", "average_rating", "ratings_count", "original_publication_year"):
+            for descending in (False, True):
+                ordering = f"-{field}" if descending else field
+                with self.subTest(ordering=ordering):
+                    self.assertEqual(self.walk(ordering=ordering), self.expected(field, descending))
+
+    def test_cursor_pagination_matches_page_numbers(self):
+        books = []
+        for page in (1, 2, 3):
+            response = self.client.get(self.url, {
+                "page": page,
+                "ordering": "-average_rating"
+            })
+            books.extend(response.data["results"])
+
+        ids = self.walk(ordering="-average_rating")
+        ratings = dict(Book.objects.values_list("pk", "average_rating"))
+        self.assertEqual(set(ids), set(book["id"] for book in books))
+        self.assertEqual([ratings[pk] for pk in ids], [book["average_rating"] for book in books])
+
+    def test_cursor_pagination_with_filters(self):
+        reserved = Book.objects.filter(isbn__startswith="isbn-2")
+        for book in reserved:
+            Reservation.objects.create(book=book, status="reserved", name="Test User", email="test@example.com")
+
+        ids = self.walk(ordering="ratings_count", reserved="true")
+
+        self.assertEqual(set(ids), set(reserved.values_list("pk", flat=True)))
+
+    def test_deep_page_query_count(self):
+        response = self.client.get(self.url, {
+            "cursor": "",
+            "ordering": "ratings_count"
+        })
+        response = self.client.get(response.data["next"])
+
+        # Validators, page of books and their authors, without any COUNT
+        with self.assertNumQueries(3):
+            response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 5)
+
+    def test_page_numbers_without_cursor(self):
+        response = self.client.get(self.url, {
+            "page": 3
+        })
+
+        self.assertEqual(response.data["count"], 25)
+        self.assertEqual(len(response.data["results"]), 5)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {
+            "cursor": "not-a-cursor"
+        })
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_multiple_orderings_are_rejected(self):
+        response = self.client.get(self.url, {
+            "cursor": "",
+            "ordering": "title,-average_rating"
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BookPageCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(25):
+            book = Book.objects.create(title=f"Book {index:02}", isbn=f"isbn-{index}")
+            if index % 2:
+                Reservation.objects.create(book=book, name="Test User", email="test@example.com")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("book-list")
+
+    def count_queries(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        return response, [query["sql"] for query in queries.captured_queries if "COUNT(" in query["sql"]]
+
+    def test_unfiltered_count_is_cached(self):
+        response, counts = self.count_queries()
+        self.assertEqual((response.data["count"], response.data["count_type"]), (25, "exact"))
+        self.assertEqual(len(counts), 1)
+
+        response, counts = self.count_queries(page=2)
+        self.assertEqual((response.data["count"], response.data["count_type"]), (25, "exact"))
+        self.assertEqual(counts, [])
+
+    def test_filtered_count_is_exact_below_threshold(self):
+        response, counts = self.count_queries(reserved="true")
+        self.assertEqual((response.data["count"], response.data["count_type"]), (12, "exact"))
+        self.assertEqual(len(counts), 1)
+
+    @override_settings(BOOK_COUNT_ESTIMATE_THRESHOLD=1)
+    def test_filtered_count_is_estimated_above_threshold(self):
+        response, counts = self.count_queries(reserved="true")
+
+        self.assertEqual(response.data["count_type"], "estimate")
+        self.assertIsInstance(response.data["count"], int)
+        self.assertEqual(counts, [])
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_last_page_count_needs_no_query(self):
+        response, counts = self.count_queries(reserved="true", page=2)
+        self.assertEqual((response.data["count"], response.data["count_type"]), (12, "exact"))
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(counts, [])
+
+    def test_count_opt_out(self):
+        response, counts = self.count_queries(count="false", page=2)
+
+        self.assertEqual((response.data["count"], response.data["count_type"]), (None, "none"))
+        self.assertEqual(counts, [])
+        titles = [book["title"] for book in response.data["results"]]
+        self.assertEqual(titles, [f"Book {index}" for index in range(10, 20)])
+        self.assertIn("page=3", response.data["next"])
+        self.assertNotIn("page=", response.data["previous"])
+
+    def test_invalid_pages(self):
+        for page in ("0", "4", "last", "abc"):
+            with self.subTest(page=page):
+                self.assertEqual(self.client.get(self.url, {
+                    "page": page
+                }).status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,119 @@
+import time
+from unittest import skipUnless
+
+from books.models import Book, IngestionLog
+from config.replicas import PIN_COOKIE, ReplicaRouter, read_from
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+
+REPLICA = settings.DATABASE_REPLICAS[0] if settings.DATABASE_REPLICAS else None
+
+
+class ReplicaRouterTests(SimpleTestCase):
+
+    def test_reads_follow_read_from(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(Book), "default")
+
+        with read_from("replica1"):
+            self.assertEqual(router.db_for_read(Book), "replica1")
+            self.assertEqual(router.db_for_write(Book), "default")
+        self.assertEqual(router.db_for_read(Book), "default")
+
+    def test_migrations_only_run_on_primary(self):
+        router = ReplicaRouter()
+        self.assertTrue(router.allow_migrate("default", "books"))
+        self.assertFalse(router.allow_migrate("replica1", "books"))
+
+
+class PrimaryPinTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username="testuser", password="testpassword"))
+
+    @override_settings(DATABASE_REPLICAS=["replica1"], DATABASE_PRIMARY_PIN_SECONDS=5)
+    def test_write_pins_client_to_primary(self):
+        response = self.client.post(reverse("book-list"), {
+            "title": "New Book",
+            "authors_input": "Author One"
+        })
+
+        cookie = response.cookies[PIN_COOKIE]
+        self.assertEqual(cookie["max-age"], 5)
+        self.assertAlmostEqual(float(cookie.value), time.time() + 5, delta=2)
+
+    @override_settings(DATABASE_REPLICAS=["replica1"])
+    def test_failed_write_does_not_pin(self):
+        response = self.client.post(reverse("book-list"), {})
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+@skipUnless(REPLICA, "Set DATABASE_REPLICA_HOSTS to run the replica routing tests")
+class ReplicaReadTests(TransactionTestCase):
+    # The replica is a mirror using its own connection, so it only sees committed rows
+    databases = {"default", REPLICA} if REPLICA else {"default"}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.client.force_authenticate(self.user)
+        self.book = Book.objects.create(title="Test Book", isbn="9780321765")
+
+    def queries(self, method, url, data=None):
+        with CaptureQueriesContext(connections["default"]) as primary, \
+                CaptureQueriesContext(connections[REPLICA]) as replica:
+            response = getattr(self.client, method)(url, data)
+        return response, len(primary), len(replica)
+
+    def test_book_reads_go_to_replica(self):
+        for url in (reverse("book-list"), reverse("book-detail", kwargs={
+            "pk": self.book.pk
+        })):
+            with self.subTest(url=url):
+                response, primary, replica = self.queries("get", url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(primary, 0)
+                self.assertGreater(replica, 0)
+
+    def test_ingestion_log_reads_go_to_replica(self):
+        log = IngestionLog.objects.create(filename="books.csv")
+        for url in (reverse("ingestionlog-list"), reverse("ingestionlog-progress", kwargs={
+            "pk": log.pk
+        })):
+            with self.subTest(url=url):
+                response, primary, replica = self.queries("get", url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(primary, 0)
+
+    def test_writes_go_to_primary(self):
+        url = reverse("book-detail", kwargs={
+            "pk": self.book.pk
+        })
+        response, primary, replica = self.queries("patch", url, {
+            "title": "Renamed Book"
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_pinned_client_reads_from_primary(self):
+        self.client.cookies[PIN_COOKIE] = str(time.time() + 60)
+        response, primary, replica = self.queries("get", reverse("book-list"))
+
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_suggest_reads_from_primary(self):
+        response, primary, replica = self.queries("get", reverse("book-suggest"), {
+            "q": "test"
+        })
+        self.assertEqual(replica, 0)
@@ -0,0 +1,84 @@
+from books.models import Author, Book
+from books.tasks import process_csv
+from books.tests.utils import UploadStorageMixin
+from django.test import TestCase
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from unittest.mock import patch
+
+
+class BookSearchTests(UploadStorageMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.url = reverse("book-list")
+        self.rowling = Author.objects.create(name="J.K. Rowling")
+        self.fry = Author.objects.create(name="Stephen Fry")
+
+        self.stone = Book.objects.create(title="Harry Potter and the Philosopher's Stone", isbn13="9780747532699")
+        self.stone.authors.set([self.rowling, self.fry])
+        self.guide = Book.objects.create(title="A Guide to Wizards", original_title="Harry Potter Companion")
+        self.guide.authors.set([self.fry])
+
+    def search(self, term, **params):
+        response = self.client.get(self.url, {
+            "search": term,
+            **params
+        })
+        return [book["title"] for book in response.data["results"]]
+
+    def test_search_ranks_title_matches_first(self):
+        self.assertEqual(self.search("harry potter"), [self.stone.title, self.guide.title])
+
+    def test_search_by_author_without_duplicates(self):
+        self.assertEqual(sorted(self.search("fry")), sorted([self.stone.title, self.guide.title]))
+
+    def test_search_matches_word_prefixes(self):
+        self.assertEqual(self.search("philos"), [self.stone.title])
+
+    def test_search_without_match(self):
+        self.assertEqual(self.search("tolkien"), [])
+
+    def test_search_with_ordering(self):
+        self.assertEqual(self.search("harry", ordering="title"), [self.guide.title, self.stone.title])
+
+    def test_search_with_cursor(self):
+        response = self.client.get(self.url, {
+            "search": "harry",
+            "cursor": ""
+        })
+        self.assertEqual([book["title"] for book in response.data["results"]], [self.stone.title, self.guide.title])
+
+    def test_search_isbn_short_circuits(self):
+        # Validators, ISBN lookup, page and authors; a single page needs no count
+        with self.assertNumQueries(4):
+            titles = self.search("978-0-7475-3269-9")
+        self.assertEqual(titles, [self.stone.title])
+
+    def test_search_vector_follows_author_changes(self):
+        author = Author.objects.create(name="Newt Scamander")
+        self.guide.authors.add(author)
+        self.assertEqual(self.search("scamander"), [self.guide.title])
+
+        author.name = "Luna Lovegood"
+        author.save()
+        self.assertEqual(self.search("scamander"), [])
+        self.assertEqual(self.search("lovegood"), [self.guide.title])
+
+        author.books.clear()
+        self.assertEqual(self.search("lovegood"), [])
+
+    def test_search_vector_follows_book_changes(self):
+        self.guide.title = "Fantastic Beasts"
+        self.guide.save()
+
+        self.assertEqual(self.search("beasts"), [self.guide.title])
+
+    @patch("books.tasks.send_ingestion_report")
+    def test_search_ingested_books(self, mock_send_email):
+        process_csv(
+            self.store_csv(b'title,authors\nThe Hobbit,"J.R.R. Tolkien, Christopher Tolkien"'), "a@b.c", "t.csv"
+        )
+
+        self.assertEqual(self.search("tolkien hobbit"), ["The Hobbit"])
@@ -0,0 +1,102 @@
+from io import StringIO
+from unittest.mock import patch
+
+from books.models import Author, Book, Suggestion
+from books.tasks import process_csv
+from books.tests.utils import UploadStorageMixin
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+
+class BookSuggestTests(UploadStorageMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.url = reverse("book-suggest")
+        self.tolkien = Author.objects.create(name="J.R.R. Tolkien")
+        self.hobbit = Book.objects.create(title="The Hobbit", ratings_count=500)
+        self.hobbit.authors.add(self.tolkien)
+        self.other = Book.objects.create(title="The Two Towers", ratings_count=300)
+        self.other.authors.add(self.tolkien)
+        Book.objects.create(title="Theory of Everything", ratings_count=50)
+
+    def suggest(self, q, **params):
+        response = self.client.get(self.url, {
+            "q": q,
+            **params
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(suggestion["text"], suggestion["kind"]) for suggestion in response.data["results"]]
+
+    def test_suggest_ranks_by_ratings_count(self):
+        self.assertEqual(
+            self.suggest("the"), [
+                ("The Hobbit", "title"),
+                ("The Two Towers", "title"),
+                ("Theory of Everything", "title"),
+            ]
+        )
+
+    def test_suggest_authors_by_normalized_name(self):
+        self.assertEqual(self.suggest("JRR Tol"), [("J.R.R. Tolkien", "author")])
+
+    def test_suggest_is_accent_and_case_insensitive(self):
+        Book.objects.create(title="Éclair Recipes", ratings_count=1)
+        self.assertEqual(self.suggest("ECLA"), [("Éclair Recipes", "title")])
+
+    def test_suggest_non_ascii_titles(self):
+        Book.objects.create(title="Café Society", ratings_count=2)
+        Book.objects.create(title="Die Straße", ratings_count=1)
+
+        self.assertEqual(self.suggest("cafe"), [("Café Society", "title")])
+        self.assertEqual(self.suggest("die str"), [("Die Straße", "title")])
+
+    def test_suggest_limit(self):
+        self.assertEqual(len(self.suggest("the", limit=2)), 2)
+
+    def test_suggest_empty_prefix(self):
+        self.assertEqual(self.suggest(""), [])
+
+    def test_suggest_query_count(self):
+        with self.assertNumQueries(1):
+            self.suggest("hob")
+
+    def test_suggest_follows_book_writes(self):
+        self.hobbit.title = "The Hobbit, or There and Back Again"
+        self.hobbit.save()
+        self.other.delete()
+
+        self.assertEqual(
+            self.suggest("the"), [
+                ("The Hobbit, or There and Back Again", "title"),
+                ("Theory of Everything", "title"),
+            ]
+        )
+        self.assertEqual(Suggestion.objects.get(kind="author").weight, 500)
+
+    def test_suggest_follows_author_changes(self):
+        self.hobbit.authors.clear()
+        self.other.authors.clear()
+
+        self.assertEqual(self.suggest("tolk"), [])
+
+    @patch("books.tasks.send_ingestion_report")
+    def test_suggest_ingested_books(self, mock_send_email):
+        process_csv(
+            self.store_csv(b"title,authors,ratings_count\nThe Silmarillion,J.R.R. Tolkien,400"), "a@b.c", "t.csv"
+        )
+
+        self.assertEqual(self.suggest("the s"), [("The Silmarillion", "title")])
+        self.assertEqual(Suggestion.objects.get(kind="author").weight, 1200)
+
+    def test_rebuild_suggestions(self):
+        Suggestion.objects.all().delete()
+
+        call_command("rebuild_suggestions", batch_size=2, stdout=StringIO())
+
+        self.assertEqual(Suggestion.objects.filter(kind="title").count(), 3)
+        self.assertEqual(Suggestion.objects.get(kind="author").weight, 800)
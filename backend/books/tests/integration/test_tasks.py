@@ -1,11 +1,15 @@
 from unittest.mock import patch
 
-from books.models import Author, Book, IngestionLog
+from books import ingestion
+from books.models import Author, Book, IngestionCheckpoint, IngestionLog
+from books.storage import csv_upload_storage
 from books.tasks import process_csv
-from django.test import TestCase
+from books.tests.utils import UploadStorageMixin
+from django.db import transaction
+from django.test import TestCase, override_settings
 
 
-class ProcessCSVTests(TestCase):
+class ProcessCSVTests(UploadStorageMixin, TestCase):
 
     @patch("books.tasks.send_ingestion_report")
     def test_process_csv_successful(self, mock_send_email):
@@ -13,7 +17,7 @@ class ProcessCSVTests(TestCase):
         admin_email = "test@example.com"
         filename = "test.csv"
 
-        books_inserted, books_skipped, errors = process_csv(file_data, admin_email, filename)
+        books_inserted, books_skipped, errors = process_csv(self.store_csv(file_data), admin_email, filename)
 
         self.assertEqual(books_inserted, 1)
         self.assertEqual(books_skipped, 0)
@@ -35,15 +39,16 @@ class ProcessCSVTests(TestCase):
         admin_email = "test@example.com"
         filename = "test.csv"
 
-        books_inserted, books_skipped, errors = process_csv(file_data, admin_email, filename)
+        books_inserted, books_skipped, errors = process_csv(self.store_csv(file_data), admin_email, filename)
 
         self.assertEqual(books_inserted, 0)
         self.assertEqual(books_skipped, 0)
         self.assertEqual(len(errors), 2)
-        self.assertIn("Error processing book 'Test Book 1': value too long for type character varying(13)", errors[0])
+        self.assertIn("Error processing book 'Test Book 1': Ensure this value has at most 13 characters", errors[0])
         self.assertIn(
             "Error processing book 'Test Book 2': could not convert string to float: 'invalid_rating", errors[1]
         )
+        self.assertIn("(column 'average_rating', value 'invalid_rating')", errors[1])
 
         mock_send_email.assert_called_once()
 
@@ -56,20 +61,31 @@ class ProcessCSVTests(TestCase):
         admin_email = "test@example.com"
         filename = "test.csv"
 
-        books_inserted, books_skipped, errors = process_csv(file_data, admin_email, filename)
+        books_inserted, books_skipped, errors = process_csv(self.store_csv(file_data), admin_email, filename)
 
         self.assertEqual(books_inserted, 0)
         self.assertEqual(books_skipped, 1)
         self.assertEqual(errors, [])
         mock_send_email.assert_called_once()
 
+    @override_settings(CSV_INGESTION_INDEX_MIN_ROWS=1)
+    @patch("books.tasks.send_ingestion_report")
+    def test_process_csv_reingests_non_ascii_titles(self, mock_send_email):
+        file_data = "title,authors\nCafé Society,Author 1\nDie Straße,Author 2\nﬁsh,Author 3".encode()
+
+        first = process_csv(self.store_csv(file_data), "test@example.com", "test.csv")
+        second = process_csv(self.store_csv(file_data, name="again.csv"), "test@example.com", "again.csv")
+
+        self.assertEqual((first, second), ((3, 0, []), (0, 3, [])))
+        self.assertEqual(Book.objects.count(), 3)
+
     @patch("books.tasks.send_ingestion_report")
     def test_process_csv_empty_file(self, mock_send_email):
         file_data = b""  # Empty file
         admin_email = "test@example.com"
         filename = "test.csv"
 
-        books_inserted, books_skipped, errors = process_csv(file_data, admin_email, filename)
+        books_inserted, books_skipped, errors = process_csv(self.store_csv(file_data), admin_email, filename)
 
         self.assertEqual(books_inserted, 0)
         self.assertEqual(errors, [])
@@ -81,8 +97,287 @@ class ProcessCSVTests(TestCase):
         admin_email = "test@example.com"
         filename = "test.csv"
 
-        books_inserted, books_skipped, errors = process_csv(file_data, admin_email, filename)
+        books_inserted, books_skipped, errors = process_csv(self.store_csv(file_data), admin_email, filename)
 
         self.assertEqual(books_inserted, 0)
         self.assertEqual(errors, ["Error processing book 'Test Book': 'NoneType' object has no attribute 'strip'"])
         mock_send_email.assert_called_once_with(1, 0, 0, errors, filename, admin_email)
+
+    @override_settings(CSV_INGESTION_BATCH_SIZE=2)
+    @patch("books.tasks.send_ingestion_report")
+    def test_process_csv_multiple_batches(self, mock_send_email):
+        file_data = b"title,authors\nBook 1,Author 1\nBook 2,\"Author 1, Author 2\"\nBook 3,Author 2\nBook 4,Author 3\nBook 5,Author 1"
+        admin_email = "test@example.com"
+        filename = "test.csv"
+
+        books_inserted, books_skipped, errors = process_csv(self.store_csv(file_data), admin_email, filename)
+
+        self.assertEqual(books_inserted, 5)
+        self.assertEqual(errors, [])
+        self.assertEqual(Book.objects.count(), 5)
+        self.assertEqual(Author.objects.count(), 3)
+        self.assertEqual(Book.objects.get(title="Book 2").authors.count(), 2)
+        mock_send_email.assert_called_once_with(5, 5, 0, [], filename, admin_email)
+
+    @override_settings(CSV_INGESTION_BATCH_SIZE=10)
+    @patch("books.tasks.send_ingestion_report")
+    def test_process_csv_bad_row_does_not_fail_batch(self, mock_send_email):
+        file_data = b"title,authors,isbn13\nBook 1,Author 1,9780000000001\nBook 2,Author 2,invalid_isbn-too-loooong\nBook 3,Author 3,9780000000003"
+        admin_email = "test@example.com"
+        filename = "test.csv"
+
+        books_inserted, books_skipped, errors = process_csv(self.store_csv(file_data), admin_email, filename)
+
+        self.assertEqual(books_inserted, 2)
+        self.assertEqual(len(errors), 1)
+        self.assertIn("Error processing book 'Book 2': Ensure this value has at most 13 characters", errors[0])
+        self.assertEqual(set(Book.objects.values_list("title", flat=True)), {"Book 1", "Book 3"})
+        self.assertEqual(IngestionLog.objects.get().records_processed, 2)
+
+    @patch("books.tasks.send_ingestion_report")
+    def test_process_csv_duplicate_rows_in_same_batch(self, mock_send_email):
+        file_data = b"title,authors,isbn13\nTest Book,Test Author,9780321765723\ntest book,Test Author,\nOther Book,Other Author,9780321765723"
+        admin_email = "test@example.com"
+        filename = "test.csv"
+
+        books_inserted, books_skipped, errors = process_csv(self.store_csv(file_data), admin_email, filename)
+
+        self.assertEqual(books_inserted, 1)
+        self.assertEqual(books_skipped, 2)
+        self.assertEqual(Book.objects.count(), 1)
+
+    @patch("books.tasks.send_ingestion_report")
+    def test_process_csv_removes_processed_file(self, mock_send_email):
+        file_name = self.store_csv(b"title,authors\nTest Book,Test Author")
+
+        process_csv(file_name, "test@example.com", "test.csv")
+
+        self.assertFalse(csv_upload_storage().exists(file_name))
+
+    @patch("books.tasks.send_ingestion_report")
+    def test_process_csv_missing_file_marks_log_failed(self, mock_send_email):
+        log = IngestionLog.objects.create(filename="test.csv", source="missing.csv")
+
+        books_inserted, error = process_csv("missing.csv", "test@example.com", "test.csv")
+
+        self.assertEqual(books_inserted, 0)
+        self.assertIn("Critical error", error)
+        log.refresh_from_db()
+        self.assertEqual(log.status, "failed")
+        mock_send_email.assert_not_called()
+
+    @override_settings(CSV_INGESTION_INDEX_MIN_ROWS=1)
+    @patch("books.tasks.send_ingestion_report")
+    def test_process_csv_with_dedup_index(self, mock_send_email):
+        author = Author.objects.create(name="Test Author 1")
+        book = Book.objects.create(title="Test Book", isbn13="9780321765723")
+        book.authors.add(author)
+        file_data = (
+            b"title,authors,isbn13\n"
+            b"Test Book,Test Author 1,\n"
+            b"Other Book,Other Author,9780321765723\n"
+            b"New Book,Test Author 1,\n"
+            b'new book,"Other Author, Test Author 1",'
+        )
+
+        with patch("books.ingestion.book_exists") as mock_book_exists:
+            books_inserted, books_skipped, errors = process_csv(
+                self.store_csv(file_data), "test@example.com", "test.csv"
+            )
+
+        mock_book_exists.assert_not_called()
+        self.assertEqual((books_inserted, books_skipped, errors), (1, 3, []))
+        self.assertTrue(Book.objects.filter(title="New Book").exists())
+
+
+@override_settings(CSV_INGESTION_CHUNK_SIZE=2, CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATE=True)
+class ProcessCSVChunkedTests(UploadStorageMixin, TestCase):
+
+    @patch("books.tasks.send_ingestion_report")
+    def test_process_csv_in_chunks(self, mock_send_email):
+        file_data = (
+            b"title,authors,average_rating\n"
+            b"Book 1,Author 1,4.1\n"
+            b"\"Book 2\nSecond Line\",Author 2,invalid_rating\n"
+            b"Book 3,Author 3,3.9\n"
+            b"Book 1,Author 1,4.1\n"
+            b"Book 5,Author 1,2.5"
+        )
+        admin_email = "test@example.com"
+        filename = "test.csv"
+
+        process_csv(self.store_csv(file_data), admin_email, filename)
+
+        self.assertEqual(Book.objects.count(), 3)
+        self.assertEqual(IngestionLog.objects.count(), 1)
+        log = IngestionLog.objects.get()
+        self.assertEqual(log.records_processed, 3)
+        self.assertIn("Error processing book 'Book 2\nSecond Line'", log.errors)
+
+        mock_send_email.assert_called_once()
+        books_processed, books_inserted, books_skipped, errors, _, _ = mock_send_email.call_args.args
+        self.assertEqual((books_processed, books_inserted, books_skipped, len(errors)), (5, 3, 1, 1))
+
+        self.assertEqual((log.status, log.rows_total, log.rows_processed, log.rows_failed), ("done", 5, 5, 1))
+
+    @patch("books.tasks.send_ingestion_report")
+    def test_process_csv_chunk_critical_error_fails_log(self, mock_send_email):
+        file_data = b"title,authors\nBook 1,Author 1\nBook 2,Author 2\nBook 3,Author 3\nBook 4,Author 4\nBook 5,Author 5"
+        ingest_file = ingestion.ingest_file
+
+        def fail_second_chunk(file, chunk, checkpoint):
+            if checkpoint.chunk == 1:
+                raise RuntimeError("storage unavailable")
+            return ingest_file(file, chunk, checkpoint=checkpoint)
+
+        with patch("books.tasks.ingest_file", side_effect=fail_second_chunk):
+            process_csv(self.store_csv(file_data), "test@example.com", "test.csv")
+
+        # The two rows of the failed chunk were never reached, and count as failed
+        log = IngestionLog.objects.get()
+        self.assertEqual((log.status, log.rows_total, log.rows_processed, log.rows_failed), ("failed", 5, 3, 2))
+        self.assertIn("Critical error: storage unavailable", log.errors)
+        self.assertIsNotNone(log.completed_at)
+        mock_send_email.assert_called_once()
+
+    @patch("books.tasks.send_ingestion_report")
+    def test_process_csv_redelivery_does_not_dispatch_chunks_again(self, mock_send_email):
+        file_name = self.store_csv(b"title,authors\nBook 1,Author 1\nBook 2,Author 2\nBook 3,Author 3")
+
+        with patch("books.tasks.chord") as mock_chord:
+            process_csv(file_name, "test@example.com", "test.csv")
+            process_csv(file_name, "test@example.com", "test.csv")
+
+        mock_chord.assert_called_once()
+        self.assertIsNotNone(IngestionLog.objects.get().chunks_dispatched_at)
+
+
+@override_settings(CSV_INGESTION_MODE="copy")
+class ProcessCSVCopyModeTests(UploadStorageMixin, TestCase):
+
+    @patch("books.tasks.send_ingestion_report")
+    def test_process_csv_copy_mode_successful(self, mock_send_email):
+        file_data = b"title,authors,isbn13,goodreads_book_id,best_book_id,work_id,books_count,original_publication_year,original_title,language_code,average_rating,ratings_count,image_url,small_image_url,ratings_1,ratings_2,ratings_3,ratings_4,ratings_5,work_ratings_count,work_text_reviews_count\nTest Book,\"Test Author 1, Test Author 2\",9780321765723,1,2,3,4,2000,Original Title,en,4.5,1000,http://example.com/image.jpg,http://example.com/small_image.jpg,100,150,250,200,300,500,200"
+
+        books_inserted, books_skipped, errors = process_csv(self.store_csv(file_data), "test@example.com", "test.csv")
+
+        self.assertEqual((books_inserted, books_skipped, errors), (1, 0, []))
+        book = Book.objects.get()
+        self.assertEqual(book.title, "Test Book")
+        self.assertEqual(book.isbn13, "9780321765723")
+        self.assertEqual(book.average_rating, 4.5)
+        self.assertEqual(book.ratings_5, 300)
+        self.assertIsNotNone(book.created_at)
+        self.assertEqual(set(book.authors.values_list("name", flat=True)), {"Test Author 1", "Test Author 2"})
+
+        # Books inserted with explicit ids must not break later inserts
+        Book.objects.create(title="Another Book")
+
+    @patch("books.tasks.send_ingestion_report")
+    def test_process_csv_copy_mode_with_errors(self, mock_send_email):
+        file_data = b"title,authors,isbn13,average_rating\nTest Book 1,Test Author 1,invalid_isbn-too-loooong,4.5\nTest Book 2,Test Author 2,9780321765723,invalid_rating\nTest Book 3,Test Author 3,9780321765724,4.0"
+
+        books_inserted, books_skipped, errors = process_csv(self.store_csv(file_data), "test@example.com", "test.csv")
+
+        self.assertEqual((books_inserted, books_skipped), (1, 0))
+        self.assertEqual(len(errors), 2)
+        self.assertIn("Error processing book 'Test Book 1': Ensure this value has at most 13 characters", errors[0])
+        self.assertIn(
+            "Error processing book 'Test Book 2': could not convert string to float: 'invalid_rating", errors[1]
+        )
+        self.assertEqual(list(Book.objects.values_list("title", flat=True)), ["Test Book 3"])
+
+    @patch("books.tasks.send_ingestion_report")
+    def test_process_csv_copy_mode_matches_batch_mode(self, mock_send_email):
+        author = Author.objects.create(name="Test Author 1")
+        book = Book.objects.create(title="Test Book", isbn13="9780321765723")
+        book.authors.add(author)
+        file_data = (
+            b"title,authors,isbn13,isbn\n"
+            b"test book,Test Author 1,,\n"
+            b"Other Book,Other Author,9780321765723,\n"
+            b"New Book,\"Test Author 1, New Author\",,1234567890\n"
+            b"NEW BOOK,New Author,,\n"
+            b"Third Book,Third Author,,1234567890\n"
+            b"Fourth Book,,,\n"
+        )
+
+        results = []
+        for mode in ["batch", "copy"]:
+            with self.settings(CSV_INGESTION_MODE=mode), transaction.atomic():
+                results.append(process_csv(self.store_csv(file_data), "test@example.com", "test.csv"))
+                results.append(Book.objects.count())
+                transaction.set_rollback(True)
+
+        self.assertEqual(results[:2], results[2:])
+        self.assertEqual(results[0][:2], (2, 4))
+
+
+class ProcessCSVResumeTests(UploadStorageMixin, TestCase):
+
+    file_data = b"title,authors\nBook 1,Author 1\nBook 2,Author 2\nBook 3,Author 3\nBook 4,Author 4"
+
+    @override_settings(CSV_INGESTION_BATCH_SIZE=1, CSV_INGESTION_PROGRESS_INTERVAL=0)
+    @patch("books.tasks.send_ingestion_report")
+    def test_process_csv_resumes_after_worker_loss(self, mock_send_email):
+        file_name = self.store_csv(self.file_data)
+        build_book = ingestion.build_book
+
+        def crash_on_third_book(row):
+            if row["title"] == "Book 3":
+                raise SystemExit("worker lost")
+            return build_book(row)
+
+        with patch("books.ingestion.build_book", side_effect=crash_on_third_book):
+            with self.assertRaises(SystemExit):
+                process_csv(file_name, "test@example.com", "test.csv")
+
+        checkpoint = IngestionCheckpoint.objects.get()
+        self.assertEqual((checkpoint.rows_processed, checkpoint.rows_inserted, checkpoint.completed), (2, 2, False))
+        mock_send_email.assert_not_called()
+
+        log = IngestionLog.objects.get()
+        self.assertEqual((log.status, log.rows_total, log.rows_processed), ("running", 4, 2))
+
+        with patch("books.ingestion.book_exists") as mock_book_exists:
+            mock_book_exists.return_value = False
+            books_inserted, books_skipped, errors = process_csv(file_name, "test@example.com", "test.csv")
+
+        self.assertEqual(mock_book_exists.call_count, 2)  # Only the rows after the checkpoint are checked
+        self.assertEqual((books_inserted, books_skipped, errors), (4, 0, []))
+        self.assertEqual(Book.objects.count(), 4)
+        log = IngestionLog.objects.get()
+        self.assertEqual((log.status, log.records_processed, log.rows_processed, log.rows_inserted), ("done", 4, 4, 4))
+        mock_send_email.assert_called_once_with(4, 4, 0, [], "test.csv", "test@example.com")
+
+    @patch("books.tasks.send_ingestion_report")
+    def test_process_csv_restores_checkpoint_counters(self, mock_send_email):
+        file_name = self.store_csv(self.file_data)
+        log = IngestionLog.objects.create(filename="test.csv", source=file_name)
+        IngestionCheckpoint.objects.create(
+            log=log,
+            chunk=0,
+            offset=len(b"title,authors\nBook 1,Author 1\nBook 2,Author 2\n"),
+            rows_processed=2,
+            rows_inserted=1,
+            rows_skipped=0,
+            errors=[[2, "Error processing book 'Book 2': boom"]],
+        )
+
+        books_inserted, books_skipped, errors = process_csv(file_name, "test@example.com", "test.csv")
+
+        self.assertEqual((books_inserted, books_skipped), (3, 0))
+        self.assertEqual(errors, ["Error processing book 'Book 2': boom"])
+        self.assertEqual(set(Book.objects.values_list("title", flat=True)), {"Book 3", "Book 4"})
+        mock_send_email.assert_called_once_with(4, 3, 0, errors, "test.csv", "test@example.com")
+
+    @patch("books.tasks.send_ingestion_report")
+    def test_process_csv_completed_ingestion_is_not_repeated(self, mock_send_email):
+        file_name = self.store_csv(self.file_data)
+        process_csv(file_name, "test@example.com", "test.csv")
+        self.store_csv(self.file_data, name=file_name)
+
+        self.assertIsNone(process_csv(file_name, "test@example.com", "test.csv"))
+
+        mock_send_email.assert_called_once()
+        self.assertEqual(IngestionLog.objects.count(), 1)
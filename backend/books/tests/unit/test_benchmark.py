@@ -0,0 +1,60 @@
+import csv
+import io
+
+from books.benchmark import GOODREADS_COLUMNS, compare_reports, generate_books_csv
+from django.test import SimpleTestCase
+
+
+class GenerateBooksCSVTests(SimpleTestCase):
+
+    def generate(self, rows, **kwargs):
+        file = io.StringIO()
+        generate_books_csv(file, rows, **kwargs)
+        return file.getvalue()
+
+    def test_generate_rows(self):
+        rows = list(csv.DictReader(io.StringIO(self.generate(500))))
+
+        self.assertEqual(len(rows), 500)
+        self.assertEqual(list(rows[0]), GOODREADS_COLUMNS)
+        self.assertTrue(any(", " in row["authors"] for row in rows))
+
+    def test_generate_is_deterministic(self):
+        self.assertEqual(self.generate(200, seed=1), self.generate(200, seed=1))
+        self.assertNotEqual(self.generate(200, seed=1), self.generate(200, seed=2))
+
+    def test_generate_duplicates(self):
+        rows = list(csv.DictReader(io.StringIO(self.generate(1000, duplicate_rate=0.2, error_rate=0))))
+        book_ids = [row["book_id"] for row in rows]
+
+        self.assertGreater(len(book_ids) - len(set(book_ids)), 100)
+
+    def test_generate_without_duplicates_or_errors(self):
+        rows = list(csv.DictReader(io.StringIO(self.generate(300, duplicate_rate=0, error_rate=0))))
+
+        self.assertEqual(len(set(row["book_id"] for row in rows)), 300)
+        self.assertTrue(all(float(row["average_rating"]) <= 5 for row in rows))
+
+
+class CompareReportsTests(SimpleTestCase):
+
+    def test_compare_reports(self):
+        baseline = {
+            "rows_per_second": 1000,
+            "queries_per_row": 0.5
+        }
+        report = {
+            "rows_per_second": 800,
+            "queries_per_row": 0.25
+        }
+
+        changes = compare_reports(baseline, report)
+
+        self.assertAlmostEqual(changes["rows_per_second"], 0.2)
+        self.assertAlmostEqual(changes["queries_per_row"], -0.5)
+
+    def test_compare_reports_missing_metrics(self):
+        self.assertEqual(compare_reports({}, {
+            "rows_per_second": 10,
+            "queries_per_row": 1
+        }), {})
@@ -0,0 +1,85 @@
+from books.converters import BOOK_SCHEMA, Column, ConversionError, RowConverter, book_converter, parse_int
+from books.models import Book
+from django.test import SimpleTestCase
+
+
+class ParseIntTests(SimpleTestCase):
+
+    def test_parse_int(self):
+        self.assertEqual(parse_int("42"), 42)
+
+    def test_parse_int_float_notation(self):
+        self.assertEqual(parse_int("2000.0"), 2000)
+
+    def test_parse_int_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_int("abc")
+
+
+class RowConverterTests(SimpleTestCase):
+
+    def test_convert_row(self):
+        book = book_converter({
+            "title": " Test Book ",
+            "isbn13": "9780321765723",
+            "isbn": "1.23E+09",
+            "original_publication_year": "1999.0",
+            "average_rating": "4.5",
+            "ratings_count": "",
+            "language_code": "  ",
+        })
+
+        self.assertIsInstance(book, Book)
+        self.assertIsNone(book.pk)
+        self.assertEqual(book.title, "Test Book")
+        self.assertEqual(book.isbn13, "9780321765723")
+        self.assertIsNone(book.isbn)
+        self.assertEqual(book.original_publication_year, 1999)
+        self.assertEqual(book.average_rating, 4.5)
+        self.assertIsNone(book.ratings_count)
+        self.assertIsNone(book.language_code)
+        self.assertEqual(book.books_count, 1)
+
+    def test_convert_row_error_names_column_and_value(self):
+        with self.assertRaises(ConversionError) as context:
+            book_converter({
+                "title": "Test Book",
+                "ratings_count": "many"
+            })
+
+        self.assertEqual((context.exception.column, context.exception.value), ("ratings_count", "many"))
+        self.assertIn("(column 'ratings_count', value 'many')", str(context.exception))
+
+    def test_convert_many_matches_row_conversion(self):
+        rows = [
+            {
+                "title": "Book 1",
+                "average_rating": "4.1",
+                "books_count": "3"
+            },
+            {
+                "title": "Book 2",
+                "average_rating": "bad",
+                "ratings_1": "bad too"
+            },
+            {
+                "title": "Book 3",
+                "work_id": "7.0"
+            },
+        ]
+
+        books, errors = book_converter.convert_many(rows)
+
+        self.assertEqual(list(errors), [1])
+        self.assertEqual(errors[1].column, "average_rating")
+        self.assertIsNone(books[1])
+        for index in (0, 2):
+            expected = book_converter(rows[index])
+            self.assertEqual(
+                [getattr(books[index], column.name) for column in BOOK_SCHEMA],
+                [getattr(expected, column.name) for column in BOOK_SCHEMA],
+            )
+
+    def test_unknown_column(self):
+        with self.assertRaises(ValueError):
+            RowConverter(Book, [Column("not_a_field", int)])
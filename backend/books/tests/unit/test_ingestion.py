@@ -0,0 +1,297 @@
+import io
+from unittest import skipUnless
+from unittest.mock import patch
+
+from books.copy_ingestion import CopyIngestor
+from books.ingestion import (
+    AuthorResolver, BatchIngestor, Chunk, DedupIndex, iter_csv_rows, key_lock_id, lock_book_keys, plan_chunks
+)
+from books.models import Author, Book
+from books.utils import book_exists, book_keys
+from django.db import DatabaseError, connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+
+class PlanChunksTests(SimpleTestCase):
+
+    def test_plan_chunks_splits_on_row_boundaries(self):
+        file = io.BytesIO(b"title,authors\nBook 1,Author 1\nBook 2,Author 2\nBook 3,Author 3\n")
+
+        self.assertEqual(plan_chunks(file, 2), [Chunk(14, 46, 1, 2), Chunk(46, 62, 3, 1)])
+
+    def test_plan_chunks_keeps_multiline_rows_together(self):
+        file = io.BytesIO(b'title,authors\n"Book\n1",Author 1\nBook 2,Author 2\n')
+
+        chunks = plan_chunks(file, 1)
+
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual([row["title"] for row, _ in iter_csv_rows(file, chunks[0].start, chunks[0].end)], ["Book\n1"])
+        self.assertEqual([row["title"] for row, _ in iter_csv_rows(file, chunks[1].start, chunks[1].end)], ["Book 2"])
+
+    def test_plan_chunks_empty_file(self):
+        self.assertEqual(plan_chunks(io.BytesIO(b""), 2), [])
+
+
+class IterCSVRowsTests(SimpleTestCase):
+
+    def test_iter_csv_rows_reports_offsets(self):
+        file = io.BytesIO(b"title,authors\nBook 1,Author 1\nBook 2,Author 2\n")
+
+        rows = list(iter_csv_rows(file))
+
+        self.assertEqual(
+            rows, [({
+                "title": "Book 1",
+                "authors": "Author 1"
+            }, 30), ({
+                "title": "Book 2",
+                "authors": "Author 2"
+            }, 46)]
+        )
+
+    def test_iter_csv_rows_byte_range(self):
+        file = io.BytesIO(b"title,authors\nBook 1,Author 1\nBook 2,Author 2\nBook 3,Author 3\n")
+
+        rows = [row["title"] for row, _ in iter_csv_rows(file, 30, 46)]
+
+        self.assertEqual(rows, ["Book 2"])
+
+    def test_iter_csv_rows_empty_file(self):
+        self.assertEqual(list(iter_csv_rows(io.BytesIO(b""))), [])
+
+
+class DedupIndexTests(TestCase):
+
+    def setUp(self):
+        author = Author.objects.create(name="Test Author 1")
+        book = Book.objects.create(title="Test Book 1", isbn="9780000002", isbn13="9780000000001")
+        book.authors.add(author)
+        Book.objects.create(title="Test Book 2")
+
+    def test_dedup_index_matches_book_exists(self):
+        index = DedupIndex.load()
+        rows = [
+            {
+                "title": "Other Title",
+                "authors": "Other Author",
+                "isbn13": "9780000000001"
+            },
+            {
+                "title": "Other Title",
+                "authors": "Other Author",
+                "isbn": "9780000002"
+            },
+            {
+                "title": "test book 1 ",
+                "authors": "Other Author, TEST Author 1"
+            },
+            {
+                "title": "Test Book 1",
+                "authors": "Other Author"
+            },
+            {
+                "title": "Test Book 2",
+                "authors": "Test Author 1"
+            },
+            {
+                "isbn13": "9780000000001"
+            },
+        ]
+
+        for row in rows:
+            self.assertEqual(index.matches(book_keys(row)), book_exists(row), row)
+
+        # Loading only the keys of the rows gives the same answers, with a query per key type in each batch
+        keys = set().union(*(book_keys(row) for row in rows))
+        with self.assertNumQueries(4):
+            index = DedupIndex.load(keys, batch_size=2)
+        for row in rows:
+            self.assertEqual(index.matches(book_keys(row)), book_exists(row), row)
+        self.assertEqual(index.isbns, {"9780000002"})
+
+    def test_dedup_index_add(self):
+        index = DedupIndex.load()
+        keys = book_keys({
+            "title": "New Book",
+            "authors": "New Author",
+            "isbn": "1234567890"
+        })
+
+        self.assertFalse(index.matches(keys))
+        index.add(keys)
+        self.assertTrue(index.matches(book_keys({
+            "title": "NEW BOOK",
+            "authors": "new author"
+        })))
+        self.assertTrue(
+            index.matches(book_keys({
+                "title": "Another Book",
+                "authors": "Another Author",
+                "isbn": "1234567890"
+            }))
+        )
+
+
+class AuthorResolverTests(TestCase):
+
+    def setUp(self):
+        self.author = Author.objects.create(name="J.K. Rowling")
+
+    def test_resolve_existing_and_new_authors(self):
+        resolver = AuthorResolver()
+
+        with self.assertNumQueries(3):
+            resolved = resolver.resolve(["JK Rowling", "New Author", "new  author"])
+
+        self.assertEqual(resolved["JK Rowling"], self.author.pk)
+        self.assertEqual(resolved["New Author"], resolved["new  author"])
+        new_author = Author.objects.get(pk=resolved["New Author"])
+        self.assertEqual((new_author.name, new_author.normalized_name), ("New Author", "new author"))
+
+    def test_resolve_uses_cache(self):
+        resolver = AuthorResolver()
+        resolver.resolve(["J.K. Rowling", "New Author"])
+
+        with self.assertNumQueries(0):
+            resolved = resolver.resolve(["jk rowling", "New Author"])
+
+        self.assertEqual(resolved["jk rowling"], self.author.pk)
+
+    def test_rollback_forgets_uncommitted_authors(self):
+        resolver = AuthorResolver()
+        resolver.resolve(["New Author"])
+        resolver.rollback()
+
+        with self.assertNumQueries(1):
+            resolver.resolve(["New Author"])
+
+    def test_resolve_caches_names_without_ascii_characters(self):
+        resolver = AuthorResolver()
+        resolved = resolver.resolve(["村上春樹"])
+        resolver.commit()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(resolver.resolve(["村上春樹"]), resolved)
+        self.assertEqual(Author.objects.get(pk=resolved["村上春樹"]).name, "村上春樹")
+
+        resolver.rollback()
+        with self.assertNumQueries(0):
+            resolver.resolve(["村上春樹"])
+
+
+@skipUnless(connection.vendor == "postgresql", "Advisory locks are PostgreSQL only")
+class LockBookKeysTests(TestCase):
+
+    def test_locks_each_key_of_the_batch(self):
+        keys = book_keys({
+            "title": "Test Book",
+            "authors": "Author One, Author Two",
+            "isbn": "1234567890"
+        })
+        lock_book_keys(keys)
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND pid = pg_backend_pid()")
+            self.assertEqual(cursor.fetchone()[0], 3)
+
+    def test_lock_ids_are_stable(self):
+        # Workers in other processes must lock the same ids, so Python's salted hash() cannot be used
+        self.assertEqual(key_lock_id(("isbn", "1234567890")), 7476756736749108288)
+
+
+class BatchIngestorTests(TestCase):
+
+    def ingest(self, rows):
+        ingestor = BatchIngestor(dedup_index=DedupIndex())
+        for row in rows:
+            ingestor.add(row)
+        return ingestor
+
+    def rows(self, count):
+        return [{
+            "title": f"Book {i}",
+            "authors": f"Author {i}",
+            "isbn13": f"978000000{i:04d}"
+        } for i in range(count)]
+
+    def test_bad_value_does_not_fail_the_batch(self):
+        rows = self.rows(32)
+        rows[21]["isbn13"] = "9780000000000000"
+        with CaptureQueriesContext(connection) as clean_batch:
+            self.ingest(rows[:16]).flush()
+        ingestor = self.ingest(rows[16:])
+
+        # The same queries as a batch without a bad row: it is rejected on conversion, before the write
+        with self.assertNumQueries(len(clean_batch)):
+            ingestor.flush()
+
+        self.assertEqual(ingestor.books_inserted, 15)
+        self.assertEqual(
+            ingestor.errors, [
+                "Error processing book 'Book 21': Ensure this value has at most 13 characters (it has 16). "
+                "(column 'isbn13', value '9780000000000000')"
+            ]
+        )
+
+    def test_bad_author_name_does_not_fail_the_batch(self):
+        rows = self.rows(4)
+        rows[1]["authors"] = "Author 1, " + "A" * 300
+        ingestor = self.ingest(rows)
+        ingestor.flush()
+
+        self.assertEqual(ingestor.books_inserted, 3)
+        self.assertEqual(len(ingestor.errors), 1)
+        self.assertIn("'Book 1': Ensure this value has at most 255 characters", ingestor.errors[0])
+
+    def test_failed_batch_is_split_until_the_bad_row_is_isolated(self):
+        ingestor = self.ingest(self.rows(16))
+        write = BatchIngestor._write
+
+        def fail_on_book_5(self, entries):
+            if any(entry.book.title == "Book 5" for entry in entries):
+                raise DatabaseError("could not extend file")
+            return write(self, entries)
+
+        with patch.object(BatchIngestor, "_write", autospec=True, side_effect=fail_on_book_5) as mock_write:
+            ingestor.flush()
+
+        # One write per half down to the bad row, where retrying row by row took one per row
+        self.assertEqual(mock_write.call_count, 9)
+        self.assertEqual(ingestor.books_inserted, 15)
+        self.assertEqual(ingestor.errors, ["Error processing book 'Book 5': could not extend file"])
+        self.assertFalse(Book.objects.filter(title="Book 5").exists())
+
+
+@skipUnless(connection.vendor == "postgresql", "COPY ingestion is PostgreSQL only")
+class CopyIngestorTests(TestCase):
+
+    def test_copy_ingestor_skips_books_stored_after_index_load(self):
+        author = Author.objects.create(name="Test Author 1")
+        book = Book.objects.create(title="Test Book", isbn="1234567890")
+        book.authors.add(author)
+
+        ingestor = CopyIngestor(dedup_index=DedupIndex())
+        ingestor.add({
+            "title": "TEST BOOK",
+            "authors": "Test Author 1"
+        })
+        ingestor.add({
+            "title": "Other Book",
+            "authors": "Other Author",
+            "isbn": "1234567890"
+        })
+        ingestor.add({
+            "title": "New Book",
+            "authors": "Test Author 1"
+        })
+        ingestor.flush()
+        ingestor.close()
+
+        self.assertEqual((ingestor.books_inserted, ingestor.books_skipped, ingestor.errors), (1, 2, []))
+        self.assertEqual(Book.objects.get(title="New Book").authors.get(), author)
+
+        # The staging table is temporary, and dropped with the transaction of the batch
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT relpersistence FROM pg_class WHERE relname LIKE 'books_ingest_stage%'")
+            self.assertEqual(cursor.fetchall(), [("t", )])
@@ -1,6 +1,9 @@
-from books.models import Author, Book, IngestionLog
+from datetime import timedelta
+
+from books.models import Author, Book, IngestionCheckpoint, IngestionLog
 from django.db import DataError, IntegrityError
 from django.test import TestCase
+from django.utils import timezone
 
 
 class AuthorModelTests(TestCase):
@@ -133,3 +136,46 @@ class IngestionLogModelTests(TestCase):
         errors_string = "; ".join(errors_list)
         log = IngestionLog.objects.create(filename="test.csv", records_processed=5, errors=errors_string)
         self.assertEqual(log.errors, errors_string)
+
+    def test_ingestion_log_refresh_progress_sums_checkpoints(self):
+        log = IngestionLog.objects.create(filename="test.csv")
+        IngestionCheckpoint.objects.create(log=log, chunk=0, rows_processed=10, rows_inserted=7, rows_skipped=2)
+        IngestionCheckpoint.objects.create(log=log, chunk=1, rows_processed=5, rows_inserted=5, rows_skipped=0)
+
+        log.refresh_progress()
+        log.refresh_from_db()
+
+        self.assertEqual((log.rows_processed, log.rows_inserted, log.rows_skipped, log.rows_failed), (15, 12, 2, 1))
+        self.assertIsNotNone(log.progress_updated_at)
+
+    def test_ingestion_log_refresh_progress_is_throttled(self):
+        log = IngestionLog.objects.create(filename="test.csv", progress_updated_at=timezone.now())
+        IngestionCheckpoint.objects.create(log=log, chunk=0, rows_processed=10, rows_inserted=10)
+
+        log.refresh_progress(interval=60)
+        log.refresh_from_db()
+        self.assertEqual(log.rows_processed, 0)
+
+        IngestionLog.objects.filter(pk=log.pk).update(progress_updated_at=timezone.now() - timedelta(minutes=2))
+        log.refresh_progress(interval=60)
+        log.refresh_from_db()
+        self.assertEqual(log.rows_processed, 10)
+
+    def test_ingestion_log_rate_and_eta(self):
+        log = IngestionLog(
+            status="running", rows_total=300, rows_processed=100, started_at=timezone.now() - timedelta(seconds=10)
+        )
+        self.assertAlmostEqual(log.rows_per_second, 10, delta=0.5)
+        self.assertAlmostEqual(log.eta_seconds, 20, delta=1)
+
+    def test_ingestion_log_has_no_eta_once_done(self):
+        started_at = timezone.now() - timedelta(seconds=10)
+        log = IngestionLog(
+            status="done",
+            rows_total=100,
+            rows_processed=100,
+            started_at=started_at,
+            completed_at=started_at + timedelta(seconds=4)
+        )
+        self.assertEqual(log.rows_per_second, 25)
+        self.assertIsNone(log.eta_seconds)
@@ -0,0 +1,27 @@
+from books.search import normalize_isbn, search_query
+from django.test import SimpleTestCase
+
+
+class NormalizeISBNTests(SimpleTestCase):
+
+    def test_isbn13(self):
+        self.assertEqual(normalize_isbn("978-0-7475-3269-9"), "9780747532699")
+
+    def test_isbn10_with_check_character(self):
+        self.assertEqual(normalize_isbn("0 8044 2957 x"), "080442957X")
+
+    def test_not_an_isbn(self):
+        self.assertIsNone(normalize_isbn("harry potter"))
+        self.assertIsNone(normalize_isbn("97807475"))
+
+
+class SearchQueryTests(SimpleTestCase):
+
+    def test_search_query_prefixes_every_word(self):
+        self.assertEqual(search_query("Harry  Pot").source_expressions[-1].value, "harry:* & pot:*")
+
+    def test_search_query_drops_operators(self):
+        self.assertEqual(search_query("harry & !potter:*").source_expressions[-1].value, "harry:* & potter:*")
+
+    def test_search_query_without_words(self):
+        self.assertIsNone(search_query("&!|"))
@@ -1,5 +1,5 @@
 from books.models import Author, Book
-from books.utils import book_exists, clean_isbn, normalize_name
+from books.utils import book_exists, book_keys, clean_isbn, existing_book_keys, normalize_name
 from django.test import TestCase
 
 
@@ -148,3 +148,41 @@ class NormalizeNameTests(TestCase):
 
     def test_normalize_name_with_unicode(self):
         self.assertEqual(normalize_name("José Pérez"), "jose perez")
+
+
+class ExistingBookKeysTests(TestCase):
+
+    def setUp(self):
+        self.author = Author.objects.create(name="Test Author 1")
+        self.book = Book.objects.create(title="Test Book 1", isbn="9780000002", isbn13="9780000000001")
+        self.book.authors.add(self.author)
+
+    def test_existing_book_keys(self):
+        keys = book_keys({
+            "title": "test book 1",
+            "authors": "Test Author 1, Other Author",
+            "isbn13": "9780000000001",
+            "isbn": "9780000009",
+        })
+
+        self.assertEqual(
+            existing_book_keys(keys), {("isbn13", "9780000000001"), ("title", "TEST BOOK 1", "test author 1")}
+        )
+
+    def test_existing_book_keys_no_match(self):
+        keys = book_keys({
+            "title": "Test Book 1",
+            "authors": "Other Author"
+        })
+
+        self.assertEqual(existing_book_keys(keys), set())
+
+    def test_existing_book_keys_non_ascii_title(self):
+        self.book.authors.add(Author.objects.create(name="Other Author"))
+        Book.objects.filter(pk=self.book.pk).update(title="Die Straße")
+        keys = book_keys({
+            "title": "die strasse",
+            "authors": "Other Author"
+        })
+
+        self.assertEqual(existing_book_keys(keys), {("title", "DIE STRASSE", "other author")})
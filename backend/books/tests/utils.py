@@ -0,0 +1,30 @@
+import tempfile
+
+from books.storage import csv_upload_storage
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+
+class UploadStorageMixin:
+    """Point the CSV upload storage at a temporary directory for each test."""
+
+    def setUp(self):
+        super().setUp()
+        upload_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(upload_dir.cleanup)
+
+        storages = {
+            **settings.STORAGES,
+            "csv_uploads": {
+                "BACKEND": "django.core.files.storage.FileSystemStorage",
+                "OPTIONS": {
+                    "location": upload_dir.name,
+                },
+            },
+        }
+        override = self.settings(STORAGES=storages)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def store_csv(self, content, name="test.csv"):
+        return csv_upload_storage().save(name, ContentFile(content))
@@ -38,6 +38,53 @@ def book_exists(row):
     return queryset.exists()
 
 
+def book_keys(row):
+    """Return the keys :func:`book_exists` matches on, so rows can be compared without a query."""
+    title = row.get("title", "").strip()
+    authors = row.get("authors", "").strip()
+
+    if not title or not authors:
+        return set()
+
+    keys = set(("title", title.upper(), normalize_name(author)) for author in authors.split(","))
+
+    isbn13 = clean_isbn(row.get("isbn13", ""))
+    if isbn13:
+        keys.add(("isbn13", isbn13))
+
+    isbn = clean_isbn(row.get("isbn", ""))
+    if isbn:
+        keys.add(("isbn", isbn))
+
+    return keys
+
+
+def existing_book_keys(keys):
+    """Return the subset of :func:`book_keys` keys already matched by a stored book, in a few queries."""
+    from books.models import Book
+
+    isbn13s = set(key[1] for key in keys if key[0] == "isbn13")
+    isbns = set(key[1] for key in keys if key[0] == "isbn")
+    authors = set(key[2] for key in keys if key[0] == "title")
+
+    existing = set()
+
+    if isbn13s:
+        existing.update(("isbn13", isbn13)
+                        for isbn13 in Book.objects.filter(isbn13__in=isbn13s).values_list("isbn13", flat=True))
+
+    if isbns:
+        existing.update(("isbn", isbn) for isbn in Book.objects.filter(isbn__in=isbns).values_list("isbn", flat=True))
+
+    if authors:
+        # Titles are upper-cased here like in book_keys, as the database UPPER differs on non-ASCII text
+        pairs = Book.authors.through.objects.filter(author__normalized_name__in=authors
+                                                    ).values_list("book__title", "author__normalized_name")
+        existing.update(("title", title.upper(), author) for title, author in pairs)
+
+    return existing & keys
+
+
 def normalize_name(name):
     """Normalize author names: remove accents, extra spaces, and convert to lowercase."""
     name = unicodedata.normalize("NFKD", name).encode("ASCII", "ignore").decode("utf-8")
@@ -1,42 +1,76 @@
+from config.replicas import ReplicaReadMixin
+from django.db.models import Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import status, views, viewsets, filters, permissions
+from rest_framework import status, views, viewsets, permissions
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from .filters import BookFilter
+from .cache import CatalogCacheMixin
+from .conditional import ConditionalGetMixin
+from .fieldsets import SparseFieldsetMixin, linked_authors
+from .filters import BookFilter, BookOrderingFilter, BookSearchFilter
 from .models import Book, IngestionLog
-from .serializers import (BookSerializer, IngestionLogSerializer, CSVUploadSerializer)
+from .pagination import BookPagination
+from .serializers import (
+    BookSerializer, IngestionLogSerializer, IngestionProgressSerializer, CSVUploadSerializer, SuggestionSerializer
+)
+from .storage import csv_upload_storage
+from .suggestions import MAX_SUGGESTION_LIMIT, SUGGESTION_LIMIT, suggest
 from .tasks import process_csv
 
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(ReplicaReadMixin, ConditionalGetMixin, CatalogCacheMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """
-    API to CRUD books
+    API to CRUD books; reads support conditional GETs, ``?fields=`` sparse fieldsets and anonymous ones are
+    served from the book cache
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
+    pagination_class = BookPagination
 
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter, DjangoFilterBackend]
-    search_fields = ['title', 'authors__name', 'isbn', 'isbn13']
+    filter_backends = [BookSearchFilter, BookOrderingFilter, DjangoFilterBackend]
+    search_fields = ['title', 'authors__name', 'isbn', 'isbn13']  # Used when full-text search is unavailable
     filterset_class = BookFilter
     ordering_fields = ['title', 'average_rating', 'ratings_count', 'original_publication_year']
     ordering = ['title']
 
+    def get_queryset(self):
+        # Serialize pages with a constant number of queries: the authors come from a single prefetch
+        return super().get_queryset().prefetch_related(Prefetch('authors', queryset=linked_authors()))
+
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:  # Allow any for list and retrieve
+        if self.action in ['list', 'retrieve', 'suggest']:  # Allow any for reads
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticated()]
 
+    @action(detail=False)
+    def suggest(self, request):
+        """Title and author completions of ``?q=``, for the search box."""
+        try:
+            limit = min(int(request.query_params.get('limit', SUGGESTION_LIMIT)), MAX_SUGGESTION_LIMIT)
+        except ValueError:
+            limit = SUGGESTION_LIMIT
+
+        suggestions = suggest(request.query_params.get('q', ''), max(limit, 1))
+        return Response({
+            'results': SuggestionSerializer(suggestions, many=True).data
+        })
 
 
-class IngestionLogViewSet(viewsets.ReadOnlyModelViewSet):
+class IngestionLogViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
-    API to list ingestion logs
+    API to list ingestion logs and poll the progress of an ingestion job
     """
-    queryset = IngestionLog.objects.all()
+    replica_actions = ('list', 'retrieve', 'progress')
+    queryset = IngestionLog.objects.order_by('-ingested_at')
     serializer_class = IngestionLogSerializer
     permission_classes = [IsAuthenticated]
 
+    @action(detail=True, serializer_class=IngestionProgressSerializer)
+    def progress(self, request, pk=None):
+        return Response(self.get_serializer(self.get_object()).data)
+
 
 class CSVUploadView(views.APIView):
     permission_classes = [IsAuthenticated]
@@ -51,10 +85,13 @@ class CSVUploadView(views.APIView):
 
         admin_email = request.user.email
 
-        file_data = file.read()
-        process_csv.delay(file_data, admin_email, file.name)
+        # Spool the upload to storage so only its name travels through the broker
+        file_name = csv_upload_storage().save(file.name, file)
+        log = IngestionLog.objects.create(filename=file.name, source=file_name)
+        process_csv.delay(file_name, admin_email, file.name)
 
         return Response({
-            "message": "CSV ingestion started. You will receive an email upon completion."
+            "message": "CSV ingestion started. You will receive an email upon completion.",
+            "job_id": log.pk,
         },
                         status=status.HTTP_202_ACCEPTED)
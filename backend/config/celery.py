@@ -2,6 +2,7 @@
 from __future__ import absolute_import, unicode_literals
 import os
 from celery import Celery
+from celery.schedules import crontab
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')  # Adjust if your settings module is different
@@ -13,3 +14,15 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Auto-discover tasks from all installed apps
 app.autodiscover_tasks()
+
+# Periodic tasks, run by `celery -A config.celery beat`
+app.conf.beat_schedule = {
+    'expire-overdue-reservations': {
+        'task': 'reservations.tasks.expire_overdue_reservations',
+        'schedule': crontab(minute='*/15'),
+    },
+    'archive-closed-reservations': {
+        'task': 'reservations.tasks.archive_closed_reservations',
+        'schedule': crontab(hour=3, minute=30),
+    },
+}
@@ -0,0 +1,87 @@
+"""
+Read replica routing.
+
+Reads go to the primary unless a view opts in with :class:`ReplicaReadMixin`, which routes the queries
+of its safe requests to one of ``DATABASE_REPLICAS``. Writes, and ``select_for_update`` querysets, which
+Django routes as writes, always go to the primary. After a write request the client gets a cookie
+pinning its reads to the primary for ``DATABASE_PRIMARY_PIN_SECONDS``, so it reads its own writes while
+the replicas catch up.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+
+PIN_COOKIE = 'db_primary_pin'
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+@contextmanager
+def read_from(alias):
+    """Route the reads of the block to ``alias``, or to the primary for ``None``."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def pick_replica():
+    """A random replica alias, or ``None`` when no replica is configured."""
+    return random.choice(settings.DATABASE_REPLICAS) if settings.DATABASE_REPLICAS else None
+
+
+def is_pinned(request):
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReplicaRouter:
+    """Send reads to the alias chosen by :func:`read_from` and everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Replicas hold the same rows as the primary
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class PrimaryPinMiddleware:
+    """Pin the reads of a client that just sent a write request to the primary."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and settings.DATABASE_REPLICAS and response.status_code < 400:
+            seconds = settings.DATABASE_PRIMARY_PIN_SECONDS
+            response.set_cookie(PIN_COOKIE, str(time.time() + seconds), max_age=seconds, httponly=True, samesite='Lax')
+        return response
+
+
+class ReplicaReadMixin:
+    """Serve the safe requests of the ``replica_actions`` of a viewset from a replica, unless the client is pinned."""
+    replica_actions = ('list', 'retrieve')
+
+    def dispatch(self, request, *args, **kwargs):
+        action = self.action_map.get(request.method.lower())
+        alias = None
+        if request.method in SAFE_METHODS and action in self.replica_actions and not is_pinned(request):
+            alias = pick_replica()
+        with read_from(alias):
+            return super().dispatch(request, *args, **kwargs)
@@ -64,6 +64,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'config.replicas.PrimaryPinMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -89,10 +90,12 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+DATABASE_ENGINE = os.getenv("DATABASE_ENGINE", "postgresql")  # "sqlite3" is supported for local benchmarks
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': os.getenv("DATABASE_NAME"),
+        'ENGINE': f'django.db.backends.{DATABASE_ENGINE}',
+        'NAME': os.getenv("DATABASE_NAME") or (BASE_DIR / 'db.sqlite3' if DATABASE_ENGINE == 'sqlite3' else None),
         'USER': os.getenv("DATABASE_USER"),
         'PASSWORD': os.getenv("DATABASE_PASSWORD"),
         'HOST': os.getenv("DATABASE_HOST"),
@@ -100,6 +103,23 @@ DATABASES = {
     }
 }
 
+# Read replicas, as comma-separated "host" or "host:port" entries sharing the primary's credentials.
+# Tests run them as mirrors of the primary's test database.
+for index, replica in enumerate(filter(None, os.getenv("DATABASE_REPLICA_HOSTS", "").split(",")), start=1):
+    host, _, port = replica.strip().partition(":")
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['config.replicas.ReplicaRouter']
+DATABASE_PRIMARY_PIN_SECONDS = int(os.getenv("DATABASE_PRIMARY_PIN_SECONDS", 10))  # Reads on the primary after a write
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -134,6 +154,50 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    # Uploaded CSV files are spooled here and read back by the ingestion task
+    'csv_uploads': {
+        'BACKEND': os.getenv("CSV_UPLOAD_STORAGE_BACKEND", 'django.core.files.storage.FileSystemStorage'),
+        'OPTIONS': {
+            'location': os.getenv("CSV_UPLOAD_ROOT", BASE_DIR / 'uploads' / 'csv'),
+        },
+    },
+}
+
+# Caches
+# The "books" cache holds anonymous book responses. Celery workers bump its catalog version, so use Redis
+# (BOOK_CACHE_URL) whenever the web server and the workers run in separate processes.
+BOOK_CACHE_URL = os.getenv("BOOK_CACHE_URL")
+BOOK_CACHE_BACKEND = (
+    'django.core.cache.backends.redis.RedisCache' if BOOK_CACHE_URL else 'django.core.cache.backends.locmem.LocMemCache'
+)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'books': {
+        'BACKEND': BOOK_CACHE_BACKEND,
+        'LOCATION': BOOK_CACHE_URL or 'books',
+        'TIMEOUT': int(os.getenv("BOOK_CACHE_TTL", 300)),  # Seconds a cached response is served
+        'OPTIONS': {} if BOOK_CACHE_URL else {
+            'MAX_ENTRIES': int(os.getenv("BOOK_CACHE_MAX_ENTRIES", 1000)),  # Redis relies on its maxmemory policy
+        },
+    },
+}
+
+BOOK_COUNT_ESTIMATE_THRESHOLD = int(os.getenv("BOOK_COUNT_ESTIMATE_THRESHOLD", 10000))  # Planner estimate above it
+
+# Closed reservations move to the reservation history this many days after they were closed
+RESERVATION_ARCHIVE_AFTER_DAYS = int(os.getenv("RESERVATION_ARCHIVE_AFTER_DAYS", 30))
+RESERVATION_MAX_HOLD_DAYS = int(os.getenv("RESERVATION_MAX_HOLD_DAYS", 14))  # Active reservations then expire
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -144,3 +208,11 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
 # Celery Configuration
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", 'redis://localhost:6379/0')  # Redis URL
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", CELERY_BROKER_URL)  # Needed to run chords
+
+# CSV ingestion
+CSV_INGESTION_BATCH_SIZE = int(os.getenv("CSV_INGESTION_BATCH_SIZE", 1000))  # Rows written per bulk insert
+CSV_INGESTION_CHUNK_SIZE = int(os.getenv("CSV_INGESTION_CHUNK_SIZE", 50000))  # Rows per parallel chunk task
+CSV_INGESTION_MODE = os.getenv("CSV_INGESTION_MODE", "batch")  # "batch" or "copy" (PostgreSQL COPY fast path)
+CSV_INGESTION_INDEX_MIN_ROWS = int(os.getenv("CSV_INGESTION_INDEX_MIN_ROWS", 1000))  # Preload dedup index above
+CSV_INGESTION_PROGRESS_INTERVAL = float(os.getenv("CSV_INGESTION_PROGRESS_INTERVAL", 2))  # Seconds between log updates
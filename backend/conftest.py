@@ -0,0 +1,20 @@
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.test import override_settings
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Keep cached responses from leaking between tests."""
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def replica_reads(request):
+    """Only route reads to the replicas a test declares, as mirrors do not see uncommitted test data."""
+    databases = getattr(request.cls, "databases", ())
+    with override_settings(DATABASE_REPLICAS=[alias for alias in settings.DATABASE_REPLICAS if alias in databases]):
+        yield
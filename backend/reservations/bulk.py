@@ -0,0 +1,97 @@
+"""
+Bulk reservations: reserve, return or cancel many books in one transaction.
+
+Items are applied in book id order, so concurrent bulk requests lock the reservation index entries and
+rows of their books in the same order and cannot deadlock. Each item runs in its own savepoint and gets
+its own result, so a conflict on one book does not undo the others.
+"""
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from books.models import Book
+
+from .enums import BulkAction, ReservationStatus
+from .exceptions import ReservationConflict, is_active_reservation_conflict
+from .models import Reservation
+
+
+BULK_MAX_ITEMS = 500
+
+OK = 'ok'
+CONFLICT = 'conflict'
+NOT_FOUND = 'not_found'
+
+# Status an active reservation moves to for each bulk action
+CLOSING_STATUS = {
+    BulkAction.RETURN.value: ReservationStatus.RETURNED.value,
+    BulkAction.CANCEL.value: ReservationStatus.CANCELED.value,
+}
+
+
+def apply_bulk_reservations(items):
+    """
+    Apply validated ``{action, book, name, email}`` items and return one result per item, in input order.
+
+    A result holds the ``index``, ``action`` and ``book`` of its item, a ``status`` of ``ok``, ``conflict``
+    or ``not_found`` and either the ``reservation`` id or a ``detail`` message.
+    """
+    book_ids = set(item['book'] for item in items)
+    existing = set(Book.objects.filter(pk__in=book_ids).values_list('pk', flat=True))
+
+    results = [None] * len(items)
+    with transaction.atomic():
+        for index in sorted(range(len(items)), key=lambda index: (items[index]['book'], index)):
+            item = items[index]
+            if item['book'] not in existing:
+                outcome = {
+                    'status': NOT_FOUND,
+                    'detail': 'Book not found.'
+                }
+            elif item['action'] == BulkAction.RESERVE.value:
+                outcome = _reserve(item)
+            else:
+                outcome = _close(item)
+            results[index] = {
+                'index': index,
+                'action': item['action'],
+                'book': item['book'],
+                **outcome
+            }
+    return results
+
+
+def _reserve(item):
+    reservation = Reservation(book_id=item['book'], name=item['name'], email=item['email'])
+    try:
+        reservation.save()  # In a savepoint of its own
+    except IntegrityError as e:
+        if not is_active_reservation_conflict(e):
+            raise
+        return {
+            'status': CONFLICT,
+            'detail': str(ReservationConflict.default_detail)
+        }
+    return {
+        'status': OK,
+        'reservation': reservation.pk
+    }
+
+
+def _close(item):
+    reservation = Reservation.objects.select_for_update().filter(
+        book_id=item['book'], status=ReservationStatus.RESERVED.value
+    ).first()
+    if reservation is None:
+        return {
+            'status': CONFLICT,
+            'detail': 'This book is not reserved.'
+        }
+
+    reservation.status = CLOSING_STATUS[item['action']]
+    if item['action'] == BulkAction.RETURN.value:
+        reservation.returned_at = timezone.now()
+    reservation.save()
+    return {
+        'status': OK,
+        'reservation': reservation.pk
+    }
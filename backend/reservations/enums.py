@@ -5,6 +5,17 @@ class ReservationStatus(Enum):
     RESERVED = "reserved"
     RETURNED = "returned"
     CANCELED = "canceled"
+    EXPIRED = "expired"  # Held longer than RESERVATION_MAX_HOLD_DAYS, see reservations.models.expire_reservations
+
+    @classmethod
+    def choices(cls):
+        return [(member.value, member.name) for member in cls]
+
+
+class BulkAction(Enum):
+    RESERVE = "reserve"
+    RETURN = "return"
+    CANCEL = "cancel"
 
     @classmethod
     def choices(cls):
@@ -0,0 +1,25 @@
+from django.db import IntegrityError
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+ACTIVE_RESERVATION_CONSTRAINT = 'unique_active_reservation'
+# SQLite names the column instead of the constraint; book_id is only unique among active reservations
+ACTIVE_RESERVATION_SQLITE_MESSAGE = 'UNIQUE constraint failed: reservations_reservation.book_id'
+
+
+class ReservationConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'This book is already reserved.'
+    default_code = 'already_reserved'
+
+
+def is_active_reservation_conflict(error):
+    """Whether ``error`` is a violation of the single active reservation per book constraint."""
+    if not isinstance(error, IntegrityError):
+        return False
+    diag = getattr(error.__cause__, 'diag', None)
+    if diag is not None:
+        return diag.constraint_name == ACTIVE_RESERVATION_CONSTRAINT
+    message = str(error)
+    return ACTIVE_RESERVATION_CONSTRAINT in message or ACTIVE_RESERVATION_SQLITE_MESSAGE in message
@@ -0,0 +1,91 @@
+"""
+Reservation history: closed reservations moved out of the reservations table.
+
+Returned and canceled reservations are moved to ReservationHistory once they have been closed for
+``RESERVATION_ARCHIVE_AFTER_DAYS``, so the reservations table and its indexes only hold active and
+recently closed reservations. On PostgreSQL the history table is partitioned by month of ``reserved_at``;
+each batch is moved by a single DELETE ... RETURNING feeding an INSERT, so a reservation is never in both
+tables or in neither.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .enums import ReservationStatus
+from .models import Reservation, ReservationHistory
+
+
+COLUMNS = 'id, name, email, book_id, status, reserved_at, returned_at, updated_at'
+
+# Oldest closed reservations first; SKIP LOCKED leaves rows being updated to their transaction
+ARCHIVE_BATCH = f"""
+    WITH moved AS (
+        DELETE FROM {Reservation._meta.db_table} WHERE id IN (
+            SELECT id FROM {Reservation._meta.db_table}
+            WHERE status <> %s AND updated_at < %s
+            ORDER BY id LIMIT %s FOR UPDATE SKIP LOCKED
+        )
+        RETURNING {COLUMNS}
+    )
+    INSERT INTO {ReservationHistory._meta.db_table} ({COLUMNS}, archived_at)
+    SELECT {COLUMNS}, %s FROM moved
+"""
+
+
+def month_start(value):
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def next_month(value):
+    return value.replace(year=value.year + 1, month=1) if value.month == 12 else value.replace(month=value.month + 1)
+
+
+def partition_name(month):
+    return f'{ReservationHistory._meta.db_table}_{month:%Y_%m}'
+
+
+def create_partitions(start, end):
+    """Create the monthly history partitions covering ``start`` to ``end``, if missing."""
+    parent = connection.ops.quote_name(ReservationHistory._meta.db_table)
+    month = month_start(start)
+    with connection.cursor() as cursor:
+        while month <= end:
+            following = next_month(month)
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(partition_name(month))} '
+                f'PARTITION OF {parent} FOR VALUES FROM (%s) TO (%s)',
+                [month, following],
+            )
+            month = following
+
+
+def archive_reservations(batch_size=1000, closed_before=None):
+    """
+    Move reservations closed before ``closed_before`` to the history, ``batch_size`` per statement.
+
+    Returns the number of reservations moved. Only PostgreSQL has the partitioned history table;
+    elsewhere closed reservations stay in the reservations table and nothing is moved.
+    """
+    if connection.vendor != 'postgresql':
+        return 0
+    if closed_before is None:
+        closed_before = timezone.now() - timedelta(days=settings.RESERVATION_ARCHIVE_AFTER_DAYS)
+
+    closed = Reservation.objects.exclude(status=ReservationStatus.RESERVED.value).filter(updated_at__lt=closed_before)
+    bounds = closed.aggregate(start=Min('reserved_at'), end=Max('reserved_at'))
+    if bounds['start'] is None:
+        return 0
+    # Rows closed while archiving have a recent updated_at, so the batches only move rows counted here
+    create_partitions(bounds['start'], bounds['end'])
+
+    archived = 0
+    with connection.cursor() as cursor:
+        while True:
+            cursor.execute(ARCHIVE_BATCH, [ReservationStatus.RESERVED.value, closed_before, batch_size, timezone.now()])
+            archived += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                return archived
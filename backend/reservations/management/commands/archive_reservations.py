@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from reservations.history import archive_reservations
+
+
+class Command(BaseCommand):
+    help = "Move the reservations closed for RESERVATION_ARCHIVE_AFTER_DAYS to the reservation history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Reservations moved per statement.")
+
+    def handle(self, *args, **options):
+        archived = archive_reservations(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} reservations"))
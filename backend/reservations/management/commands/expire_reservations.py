@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from books.cache import bump_catalog_version
+from reservations.models import expire_reservations
+
+
+class Command(BaseCommand):
+    help = "Expire the reservations held longer than RESERVATION_MAX_HOLD_DAYS."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Reservations expired per UPDATE.")
+
+    def handle(self, *args, **options):
+        expired = expire_reservations(batch_size=options["batch_size"])
+        if expired:
+            bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f"Expired {expired} reservations"))
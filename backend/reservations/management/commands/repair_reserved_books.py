@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from books.cache import bump_catalog_version
+from reservations.models import repair_reserved_books
+
+
+class Command(BaseCommand):
+    help = "Rebuild the reserved state stored on every book from its active reservations."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000, help="Books checked per UPDATE.")
+
+    def handle(self, *args, **options):
+        fixed = repair_reserved_books(batch_size=options["batch_size"])
+        if fixed:
+            bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f"Fixed the reserved state of {fixed} books"))
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.5 on 2026-10-18 03:31
+
+from django.db import migrations, models
+
+
+def cancel_duplicate_reservations(apps, schema_editor):
+    # Keep the most recent active reservation of each book, so the constraint can be created
+    Reservation = apps.get_model('reservations', 'Reservation')
+    newer = Reservation.objects.filter(
+        models.Q(reserved_at__gt=models.OuterRef('reserved_at'))
+        | models.Q(reserved_at=models.OuterRef('reserved_at'), pk__gt=models.OuterRef('pk')),
+        book=models.OuterRef('book'),
+        status='reserved',
+    )
+    Reservation.objects.filter(models.Exists(newer), status='reserved').update(status='canceled')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0008_book_is_reserved'),
+        ('reservations', '0002_reservation_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(cancel_duplicate_reservations, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='reservation',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'reserved')), fields=('book',), name='unique_active_reservation'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.5 on 2026-10-18 03:36
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+TRIGRAM_INDEXES = [
+    django.contrib.postgres.indexes.GinIndex(
+        django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(field), name='gin_trgm_ops'),
+        name=f'reservation_{field}_trgm_idx',
+    )
+    for field in ('name', 'email')
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # pg_trgm is installed by books 0009 when the server provides it
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    for index in TRIGRAM_INDEXES:
+        schema_editor.add_index(apps.get_model('reservations', 'Reservation'), index)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for index in TRIGRAM_INDEXES:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {index.name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0009_book_title_trigram_index'),
+        ('reservations', '0003_unique_active_reservation'),
+    ]
+
+    operations = [
+        # Covered by reservation_status_updated_idx
+        migrations.AlterField(
+            model_name='reservation',
+            name='status',
+            field=models.CharField(choices=[('reserved', 'Reserved'), ('returned', 'Returned'), ('canceled', 'Canceled')], default='reserved', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['status', '-updated_at'], name='reservation_status_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['book', '-updated_at'], name='reservation_book_updated_idx'),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='reservation', index=index) for index in TRIGRAM_INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+            ],
+        ),
+    ]
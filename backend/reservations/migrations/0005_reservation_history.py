@@ -0,0 +1,70 @@
+# Generated by Django 5.1.5 on 2026-10-18 03:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The primary key of a partitioned table has to include the partition key; Django only sees "id"
+CREATE_PARTITIONED_TABLE = """
+    CREATE TABLE reservations_reservationhistory (
+        id bigint NOT NULL,
+        name varchar(255) NOT NULL,
+        email varchar(254) NOT NULL,
+        status varchar(10) NOT NULL,
+        reserved_at timestamp with time zone NOT NULL,
+        returned_at timestamp with time zone NULL,
+        updated_at timestamp with time zone NOT NULL,
+        archived_at timestamp with time zone NOT NULL,
+        book_id bigint NOT NULL REFERENCES books_book (id) DEFERRABLE INITIALLY DEFERRED,
+        PRIMARY KEY (id, reserved_at)
+    ) PARTITION BY RANGE (reserved_at)
+"""
+
+
+def create_history_table(apps, schema_editor):
+    # Monthly partitions are created by reservations.history when reservations are archived
+    ReservationHistory = apps.get_model('reservations', 'ReservationHistory')
+    if schema_editor.connection.vendor != 'postgresql':
+        schema_editor.create_model(ReservationHistory)
+        return
+    schema_editor.execute(CREATE_PARTITIONED_TABLE)
+    for index in ReservationHistory._meta.indexes:
+        schema_editor.add_index(ReservationHistory, index)
+
+
+def drop_history_table(apps, schema_editor):
+    # Dropping a partitioned table drops its partitions
+    schema_editor.delete_model(apps.get_model('reservations', 'ReservationHistory'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0009_book_title_trigram_index'),
+        ('reservations', '0004_reservation_list_indexes'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ReservationHistory',
+                    fields=[
+                        ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                        ('name', models.CharField(max_length=255)),
+                        ('email', models.EmailField(max_length=254)),
+                        ('status', models.CharField(choices=[('reserved', 'Reserved'), ('returned', 'Returned'), ('canceled', 'Canceled')], max_length=10)),
+                        ('reserved_at', models.DateTimeField()),
+                        ('returned_at', models.DateTimeField(blank=True, null=True)),
+                        ('updated_at', models.DateTimeField()),
+                        ('archived_at', models.DateTimeField()),
+                        ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservation_history', to='books.book')),
+                    ],
+                    options={
+                        'indexes': [models.Index(fields=['book', '-reserved_at'], name='reservation_history_book_idx'), models.Index(fields=['-reserved_at', '-id'], name='reservation_history_order_idx')],
+                    },
+                ),
+            ],
+        ),
+        # Run after the state change, so the model is available to it
+        migrations.RunPython(create_history_table, drop_history_table),
+    ]
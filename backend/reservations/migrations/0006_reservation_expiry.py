@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-18 03:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0009_book_title_trigram_index'),
+        ('reservations', '0005_reservation_history'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reservation',
+            name='status',
+            field=models.CharField(choices=[('reserved', 'Reserved'), ('returned', 'Returned'), ('canceled', 'Canceled'), ('expired', 'Expired')], default='reserved', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='reservationhistory',
+            name='status',
+            field=models.CharField(choices=[('reserved', 'Reserved'), ('returned', 'Returned'), ('canceled', 'Canceled'), ('expired', 'Expired')], max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(condition=models.Q(('status', 'reserved')), fields=['reserved_at'], name='reservation_active_age_idx'),
+        ),
+    ]
@@ -1,5 +1,11 @@
+from datetime import timedelta
+
 from books.models import Book
-from django.db import models
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Upper
 from django.utils import timezone
 
 from reservations.enums import ReservationStatus
@@ -13,14 +19,153 @@ class Reservation(models.Model):
     email = models.EmailField(db_index=True)  # External user email
 
     book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='reservations')
-    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='reserved', db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='reserved')
     reserved_at = models.DateTimeField(default=timezone.now, db_index=True)
     returned_at = models.DateTimeField(null=True, blank=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # The admin list is ordered by -updated_at, usually filtered by status or by book
+            models.Index(fields=['status', '-updated_at'], name='reservation_status_updated_idx'),
+            models.Index(fields=['book', '-updated_at'], name='reservation_book_updated_idx'),
+            # Active reservations by age, for expire_reservations
+            models.Index(
+                fields=['reserved_at'], condition=models.Q(status='reserved'), name='reservation_active_age_idx'
+            ),
+            # Substring search of the admin list (icontains), PostgreSQL with pg_trgm only
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='reservation_name_trgm_idx'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='reservation_email_trgm_idx'),
+        ]
+        constraints = [
+            # At most one active reservation per book, enforced by the index instead of a lock on the book
+            models.UniqueConstraint(
+                fields=['book'], condition=models.Q(status='reserved'), name='unique_active_reservation'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.book.title} ({self.status})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_book_id = instance.__dict__.get('book_id')
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
     def save(self, *args, **kwargs):
         self.updated_at = timezone.now()
-        super().save(*args, **kwargs)
+        loaded_book_id = getattr(self, '_loaded_book_id', None)
+        # Only a new reservation, or a change of status or book, can change Book.is_reserved. Other saves
+        # leave the book row alone, so they never queue behind or block other writes to the book.
+        changes_books = (
+            self._state.adding or self.book_id != loaded_book_id
+            or self.status != getattr(self, '_loaded_status', None)
+        )
+        # Book.is_reserved changes in the same transaction as the reservation
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if changes_books:
+                refresh_reserved_books({self.book_id, loaded_book_id} - {None})
+        self._loaded_book_id = self.book_id
+        self._loaded_status = self.status
+        if changes_books and Reservation.book.is_cached(self):
+            self.book.refresh_from_db(fields=['is_reserved'])
+
+
+class ReservationHistory(models.Model):
+    """
+    Closed reservation moved out of Reservation by reservations.history.archive_reservations.
+
+    On PostgreSQL the table is partitioned by month of ``reserved_at`` (migration 0005), with the partitions
+    created as reservations are archived.
+    """
+    STATUS_CHOICES = Reservation.STATUS_CHOICES
+
+    id = models.BigIntegerField(primary_key=True)  # Id the reservation had in Reservation
+    name = models.CharField(max_length=255)
+    email = models.EmailField()
+
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='reservation_history')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    reserved_at = models.DateTimeField()  # Partition key
+    returned_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['book', '-reserved_at'], name='reservation_history_book_idx'),
+            models.Index(fields=['-reserved_at', '-id'], name='reservation_history_order_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} - {self.book.title} ({self.status})"
+
+
+def active_reservations():
+    """Subquery of the active reservations of the outer book."""
+    return Reservation.objects.filter(book=OuterRef('pk'), status=ReservationStatus.RESERVED.value)
+
+
+def refresh_reserved_books(book_ids):
+    """
+    Recompute ``Book.is_reserved`` of the given books with a single UPDATE.
+
+    Only the books whose flag flips are written, and so locked until the transaction commits. Their
+    ``updated_at`` moves forward with it, as it is the Last-Modified of their responses.
+    """
+    if book_ids:
+        reserved = Exists(active_reservations())
+        books = Book.objects.filter(pk__in=book_ids).exclude(is_reserved=reserved)
+        books.update(is_reserved=reserved, updated_at=timezone.now())
+
+
+def repair_reserved_books(batch_size=10000):
+    """
+    Rebuild ``Book.is_reserved`` of the whole catalogue, ``batch_size`` books per UPDATE.
+
+    Only books whose state is wrong are written. Returns the number of books fixed.
+    """
+    fixed = 0
+    last_id = 0
+    while True:
+        ids = list(Book.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return fixed
+        with transaction.atomic():
+            books = Book.objects.filter(pk__gte=ids[0], pk__lte=ids[-1])
+            now = timezone.now()
+            reserved, free = Exists(active_reservations()), ~Exists(active_reservations())
+            fixed += books.filter(reserved, is_reserved=False).update(is_reserved=True, updated_at=now)
+            fixed += books.filter(free, is_reserved=True).update(is_reserved=False, updated_at=now)
+        last_id = ids[-1]
+
+
+def expire_reservations(batch_size=1000, reserved_before=None):
+    """
+    Expire the active reservations made before ``reserved_before``, ``batch_size`` per transaction.
+
+    Defaults to the reservations held longer than ``RESERVATION_MAX_HOLD_DAYS``. Each batch is one locking
+    SELECT and one UPDATE, followed by the UPDATE of the reserved state of its books. Returns the number of
+    reservations expired.
+    """
+    if reserved_before is None:
+        reserved_before = timezone.now() - timedelta(days=settings.RESERVATION_MAX_HOLD_DAYS)
+
+    overdue = Reservation.objects.filter(status=ReservationStatus.RESERVED.value, reserved_at__lt=reserved_before)
+    expired = 0
+    while True:
+        with transaction.atomic():
+            # Reservations being changed by a request are left to it, and skipped for this run
+            batch = overdue.order_by('pk').select_for_update(skip_locked=True)[:batch_size]
+            rows = list(batch.values_list('pk', 'book_id'))
+            if not rows:
+                return expired
+            # The book was not returned, so returned_at stays empty
+            expiring = Reservation.objects.filter(pk__in=[pk for pk, _ in rows])
+            expired += expiring.update(status=ReservationStatus.EXPIRED.value, updated_at=timezone.now())
+            refresh_reserved_books([book_id for _, book_id in rows])
+        if len(rows) < batch_size:
+            return expired
@@ -1,49 +1,64 @@
-from django.db import transaction
+from django.db import IntegrityError
 from rest_framework import serializers
 
-from .enums import ReservationStatus
-from .models import Book, Reservation
+from .bulk import BULK_MAX_ITEMS
+from .enums import BulkAction, ReservationStatus
+from .exceptions import ReservationConflict, is_active_reservation_conflict
+from .models import Reservation, ReservationHistory
 
 
 class ReservationSerializer(serializers.ModelSerializer):
     status = serializers.ChoiceField(choices=ReservationStatus.choices(), required=False)
+    book_title = serializers.CharField(source='book.title', read_only=True)
 
     class Meta:
         model = Reservation
-        fields = ['id', 'name', 'email', 'book', 'status', 'reserved_at', 'returned_at']
+        fields = ['id', 'name', 'email', 'book', 'book_title', 'status', 'reserved_at', 'returned_at']
         read_only_fields = ['reserved_at', 'returned_at']
+        # A second active reservation of a book is rejected by the unique_active_reservation constraint
+        # and reported as a 409, see _save
+        validators = []
 
     def create(self, validated_data):
-        book = validated_data['book']
+        return self._save(Reservation(**validated_data))
 
-        with transaction.atomic():
-            locked_book = Book.objects.select_for_update().get(pk=book.pk)
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        return self._save(instance)
 
-            if Reservation.objects.filter(book=locked_book, status=ReservationStatus.RESERVED.value).exists():
-                raise serializers.ValidationError("This book is already reserved.")
+    @staticmethod
+    def _save(reservation):
+        # Reservation.save runs in its own savepoint, so a conflict leaves the request transaction usable
+        try:
+            reservation.save()
+        except IntegrityError as e:
+            if is_active_reservation_conflict(e):
+                raise ReservationConflict()
+            raise
+        return reservation
 
-            reservation = Reservation.objects.create(**validated_data)
-            return reservation
 
-    def update(self, instance, validated_data):
-        book = instance.book
-
-        status = validated_data.get('status', instance.status)
-
-        if status == ReservationStatus.RESERVED.value:
-            with transaction.atomic():
-                locked_book = Book.objects.select_for_update().get(pk=book.pk)
-
-                if Reservation.objects.filter(book=locked_book,
-                                              status=ReservationStatus.RESERVED.value).exclude(pk=instance.pk).exists():
-                    raise serializers.ValidationError("This book is already reserved by another user.")
-
-                for attr, value in validated_data.items():
-                    setattr(instance, attr, value)
-                instance.save()
-                return instance
-        else:
-            for attr, value in validated_data.items():
-                setattr(instance, attr, value)
-            instance.save()
-            return instance
+class ReservationHistorySerializer(serializers.ModelSerializer):
+    book_title = serializers.CharField(source='book.title', read_only=True)
+
+    class Meta:
+        model = ReservationHistory
+        fields = ['id', 'name', 'email', 'book', 'book_title', 'status', 'reserved_at', 'returned_at', 'archived_at']
+
+
+class BulkReservationItemSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=BulkAction.choices())
+    book = serializers.IntegerField()
+    name = serializers.CharField(max_length=255, required=False)
+    email = serializers.EmailField(required=False)
+
+    def validate(self, attrs):
+        if attrs['action'] == BulkAction.RESERVE.value and not (attrs.get('name') and attrs.get('email')):
+            raise serializers.ValidationError("Reserving a book needs a name and an email.")
+        return attrs
+
+
+class BulkReservationSerializer(serializers.Serializer):
+    """Reservations, returns and cancellations applied together, see reservations.bulk."""
+    items = BulkReservationItemSerializer(many=True, allow_empty=False, max_length=BULK_MAX_ITEMS)
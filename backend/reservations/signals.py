@@ -0,0 +1,18 @@
+from books.cache import bump_catalog_version
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Reservation, refresh_reserved_books
+
+
+@receiver(post_delete, sender=Reservation)
+def refresh_book_reserved_state(sender, instance, **kwargs):
+    # Sent inside the deletion transaction, for queryset and cascade deletes as well
+    refresh_reserved_books([instance.book_id])
+
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def invalidate_book_cache(sender, **kwargs):
+    # Book responses carry the reserved flag
+    bump_catalog_version()
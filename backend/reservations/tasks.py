@@ -0,0 +1,20 @@
+from books.cache import bump_catalog_version
+from celery import shared_task
+
+from .history import archive_reservations
+from .models import expire_reservations
+
+
+@shared_task
+def archive_closed_reservations():
+    """Move the reservations closed for RESERVATION_ARCHIVE_AFTER_DAYS to the reservation history."""
+    return archive_reservations()
+
+
+@shared_task
+def expire_overdue_reservations():
+    """Expire the reservations held longer than RESERVATION_MAX_HOLD_DAYS, returning how many were expired."""
+    expired = expire_reservations()
+    if expired:
+        bump_catalog_version()  # Book responses carry the reserved flag
+    return expired
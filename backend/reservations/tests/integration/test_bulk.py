@@ -0,0 +1,147 @@
+from books.models import Book
+from django.contrib.auth.models import User
+from django.test import TestCase
+from reservations.enums import ReservationStatus
+from reservations.models import Reservation
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+
+class BulkReservationTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username="adminuser", password="x", is_staff=True))
+        self.url = reverse("reservation-bulk")
+        self.books = [Book.objects.create(title=f"Book {index}", isbn=f"isbn-{index}") for index in range(3)]
+
+    def reserve(self, book):
+        return {
+            "action": "reserve",
+            "book": book.pk,
+            "name": "Test User",
+            "email": "test@example.com"
+        }
+
+    def test_reserve_return_and_cancel(self):
+        returned = Reservation.objects.create(book=self.books[1], name="Reader", email="reader@example.com")
+        canceled = Reservation.objects.create(book=self.books[2], name="Reader", email="reader@example.com")
+
+        response = self.client.post(
+            self.url, {
+                "items": [
+                    self.reserve(self.books[0]),
+                    {
+                        "action": "return",
+                        "book": self.books[1].pk
+                    },
+                    {
+                        "action": "cancel",
+                        "book": self.books[2].pk
+                    },
+                ]
+            },
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["succeeded"], response.data["failed"]), (3, 0))
+        reserved = Reservation.objects.get(book=self.books[0])
+        self.assertEqual(
+            [(result["index"], result["status"], result["reservation"]) for result in response.data["results"]],
+            [(0, "ok", reserved.pk), (1, "ok", returned.pk), (2, "ok", canceled.pk)],
+        )
+
+        returned.refresh_from_db()
+        canceled.refresh_from_db()
+        self.assertEqual(returned.status, ReservationStatus.RETURNED.value)
+        self.assertIsNotNone(returned.returned_at)
+        self.assertEqual(canceled.status, ReservationStatus.CANCELED.value)
+        self.assertIsNone(canceled.returned_at)
+        self.assertEqual(list(Book.objects.order_by("pk").values_list("is_reserved", flat=True)), [True, False, False])
+
+    def test_conflicts_are_reported_per_item(self):
+        Reservation.objects.create(book=self.books[0], name="Reader", email="reader@example.com")
+
+        response = self.client.post(
+            self.url, {
+                "items": [
+                    self.reserve(self.books[0]),
+                    {
+                        "action": "return",
+                        "book": self.books[1].pk
+                    },
+                    self.reserve(self.books[2]),
+                    {
+                        "action": "cancel",
+                        "book": 0
+                    },
+                ]
+            },
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["succeeded"], response.data["failed"]), (1, 3))
+        self.assertEqual([(result["status"], result.get("detail")) for result in response.data["results"]], [
+            ("conflict", "This book is already reserved."),
+            ("conflict", "This book is not reserved."),
+            ("ok", None),
+            ("not_found", "Book not found."),
+        ])
+        self.assertEqual(Reservation.objects.filter(status=ReservationStatus.RESERVED.value).count(), 2)
+
+    def test_items_of_a_book_apply_in_request_order(self):
+        response = self.client.post(
+            self.url, {
+                "items": [
+                    self.reserve(self.books[0]),
+                    {
+                        "action": "return",
+                        "book": self.books[0].pk
+                    },
+                    self.reserve(self.books[0]),
+                ]
+            },
+            format="json"
+        )
+
+        self.assertEqual([result["status"] for result in response.data["results"]], ["ok", "ok", "ok"])
+        self.assertEqual(
+            list(Reservation.objects.order_by("pk").values_list("status", flat=True)),
+            [ReservationStatus.RETURNED.value, ReservationStatus.RESERVED.value],
+        )
+
+    def test_invalid_items(self):
+        cases = [
+            {
+                "items": []
+            },
+            {
+                "items": [{
+                    "action": "reserve",
+                    "book": self.books[0].pk
+                }]
+            },
+            {
+                "items": [{
+                    "action": "lend",
+                    "book": self.books[0].pk
+                }]
+            },
+        ]
+        for data in cases:
+            with self.subTest(data=data):
+                response = self.client.post(self.url, data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(User.objects.create_user(username="testuser", password="x"))
+        response = self.client.post(self.url, {
+            "items": [self.reserve(self.books[0])]
+        }, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Reservation.objects.exists())
@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta, timezone
+
+from books.models import Book
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from reservations.enums import ReservationStatus
+from reservations.history import archive_reservations, partition_name
+from reservations.models import Reservation, ReservationHistory
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+
+NOW = datetime.now(timezone.utc)
+
+
+class ReservationArchiveTests(TestCase):
+
+    def setUp(self):
+        self.books = [Book.objects.create(title=f"Book {index}", isbn=f"isbn-{index}") for index in range(4)]
+
+    def reservation(self, book, status, reserved_at, closed_at):
+        reservation = Reservation.objects.create(book=book, name="Reader", email="reader@example.com")
+        Reservation.objects.filter(pk=reservation.pk).update(
+            status=status.value,
+            reserved_at=reserved_at,
+            updated_at=closed_at,
+            returned_at=closed_at if status == ReservationStatus.RETURNED else None,
+        )
+        return reservation
+
+    def test_moves_long_closed_reservations(self):
+        december, february = datetime(2025, 12, 20, tzinfo=timezone.utc), datetime(2026, 2, 3, tzinfo=timezone.utc)
+        returned = self.reservation(self.books[0], ReservationStatus.RETURNED, december, NOW - timedelta(days=60))
+        canceled = self.reservation(self.books[1], ReservationStatus.CANCELED, february, NOW - timedelta(days=40))
+        recent = self.reservation(self.books[2], ReservationStatus.RETURNED, NOW, NOW - timedelta(days=1))
+        active = self.reservation(self.books[3], ReservationStatus.RESERVED, NOW - timedelta(days=90), NOW)
+
+        self.assertEqual(archive_reservations(batch_size=1), 2)
+
+        self.assertEqual(set(Reservation.objects.values_list("pk", flat=True)), {recent.pk, active.pk})
+        history = ReservationHistory.objects.order_by("reserved_at")
+        self.assertEqual(
+            list(history.values_list("pk", "book", "status")), [
+                (returned.pk, self.books[0].pk, ReservationStatus.RETURNED.value),
+                (canceled.pk, self.books[1].pk, ReservationStatus.CANCELED.value),
+            ]
+        )
+        self.assertEqual(history[0].returned_at, NOW - timedelta(days=60))
+        self.assertTrue(Book.objects.get(pk=self.books[3].pk).is_reserved)
+
+        # One partition per month between the oldest and the newest archived reservation
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = %s::regclass",
+                [ReservationHistory._meta.db_table],
+            )
+            partitions = set(name for name, in cursor.fetchall())
+        table = ReservationHistory._meta.db_table
+        self.assertEqual(partitions, set(f"{table}_{month}" for month in ("2025_12", "2026_01", "2026_02")))
+        self.assertEqual(partition_name(datetime(2026, 1, 1, tzinfo=timezone.utc)), f"{table}_2026_01")
+
+    def test_nothing_to_archive(self):
+        self.reservation(self.books[0], ReservationStatus.RESERVED, NOW - timedelta(days=90), NOW - timedelta(days=90))
+        self.assertEqual(archive_reservations(), 0)
+        self.assertFalse(ReservationHistory.objects.exists())
+
+
+class ReservationHistoryViewSetTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username="adminuser", password="x", is_staff=True))
+        self.book = Book.objects.create(title="Test Book", isbn="9780321765")
+        self.other = Book.objects.create(title="Other Book", isbn="9780321766")
+        for pk, book, reserved_at in ((1, self.book, datetime(2026, 1, 10)), (2, self.other, datetime(2026, 3, 5))):
+            reservation = Reservation.objects.create(book=book, name="Reader", email=f"reader{pk}@example.com")
+            Reservation.objects.filter(pk=reservation.pk).update(
+                status=ReservationStatus.RETURNED.value,
+                reserved_at=reserved_at.replace(tzinfo=timezone.utc),
+                updated_at=NOW - timedelta(days=60),
+            )
+        archive_reservations()
+        self.url = reverse("reservationhistory-list")
+
+    def test_list(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["book_title"] for item in response.data["results"]], ["Other Book", "Test Book"])
+        self.assertIsNotNone(response.data["results"][0]["archived_at"])
+
+    def test_filters(self):
+        cases = [
+            ({
+                "book": self.book.pk
+            }, ["Test Book"]),
+            ({
+                "reserved_at__gte": "2026-02-01T00:00:00Z"
+            }, ["Other Book"]),
+            ({
+                "reserved_at__lt": "2026-02-01T00:00:00Z"
+            }, ["Test Book"]),
+            ({
+                "search": "reader2"
+            }, ["Other Book"]),
+        ]
+        for params, expected in cases:
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual([item["book_title"] for item in response.data["results"]], expected)
+
+    def test_retrieve(self):
+        history = ReservationHistory.objects.get(book=self.book)
+        response = self.client.get(reverse("reservationhistory-detail", kwargs={
+            "pk": history.pk
+        }))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], history.email)
+
+    def test_admin_only(self):
+        self.client.force_authenticate(User.objects.create_user(username="testuser", password="x"))
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.post(self.url, {}).status_code, status.HTTP_403_FORBIDDEN)
@@ -57,8 +57,27 @@ class ReservationViewSetIntegrationTests(TestCase):
         url = reverse("reservation-list")
         response = self.client.post(url, data)
 
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn("This book is already reserved.", response.data[0])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["detail"], "This book is already reserved.")
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_reservation_update_book_already_reserved(self):
+        self.client.force_authenticate(user=self.admin_user)
+        Reservation.objects.create(name="Existing User", email="existing@example.com", book=self.book)
+        returned = Reservation.objects.create(
+            name="Test User", email="test@example.com", book=self.book, status=ReservationStatus.RETURNED.value
+        )
+        url = reverse("reservation-detail", kwargs={
+            "pk": returned.pk
+        })
+
+        response = self.client.patch(url, {
+            "status": ReservationStatus.RESERVED.value
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        returned.refresh_from_db()
+        self.assertEqual(returned.status, ReservationStatus.RETURNED.value)
 
     def test_reservation_list_admin(self):
         self.client.force_authenticate(user=self.admin_user)  # Authenticate as admin
@@ -75,6 +94,55 @@ class ReservationViewSetIntegrationTests(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_reservation_list_query_count(self):
+        self.client.force_authenticate(user=self.admin_user)
+        for index in range(5):
+            book = Book.objects.create(title=f"Book {index}", isbn13=f"isbn-{index}")
+            Reservation.objects.create(name=f"Reader {index}", email=f"reader{index}@example.com", book=book)
+        url = reverse("reservation-list")
+
+        # One count and one page query, with the books joined, whatever the number of reservations
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {
+                "status": ReservationStatus.RESERVED.value,
+                "search": "reader"
+            })
+
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual(response.data["results"][0]["book_title"], "Book 4")
+
+    def test_reservation_list_filters_and_ordering(self):
+        self.client.force_authenticate(user=self.admin_user)
+        other = Book.objects.create(title="Other Book", isbn13="9780321765724")
+        first = Reservation.objects.create(name="First", email="first@example.com", book=self.book)
+        first.status = ReservationStatus.RETURNED.value
+        first.save()
+        second = Reservation.objects.create(name="Second", email="second@example.com", book=other)
+        url = reverse("reservation-list")
+
+        cases = [
+            ({}, [second.pk, first.pk]),
+            ({
+                "ordering": "updated_at"
+            }, [first.pk, second.pk]),
+            ({
+                "book": self.book.pk
+            }, [first.pk]),
+            ({
+                "status": ReservationStatus.RESERVED.value
+            }, [second.pk]),
+            ({
+                "search": "other bo"
+            }, [second.pk]),
+            ({
+                "search": "FIRST@"
+            }, [first.pk]),
+        ]
+        for params, expected in cases:
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual([reservation["id"] for reservation in response.data["results"]], expected)
+
     def test_reservation_retrieve_admin(self):
         self.client.force_authenticate(user=self.admin_user)
         reservation = Reservation.objects.create(name="Test", email="test@test.com", book=self.book)
@@ -143,3 +211,32 @@ class ReservationViewSetIntegrationTests(TestCase):
         response = self.client.delete(url)
 
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reservation_api_maintains_book_reserved_state(self):
+        self.client.force_authenticate(user=self.user)
+        data = {
+            "name": "Test User",
+            "email": "test@example.com",
+            "book": self.book.pk
+        }
+        self.client.post(reverse("reservation-list"), data)
+        self.book.refresh_from_db()
+        self.assertTrue(self.book.is_reserved)
+
+        self.client.force_authenticate(user=self.admin_user)
+        reservation = Reservation.objects.get()
+        url = reverse("reservation-detail", kwargs={
+            "pk": reservation.pk
+        })
+        self.client.patch(url, {
+            "status": ReservationStatus.RETURNED.value
+        })
+        self.book.refresh_from_db()
+        self.assertFalse(self.book.is_reserved)
+
+        self.client.patch(url, {
+            "status": ReservationStatus.RESERVED.value
+        })
+        self.client.delete(url)
+        self.book.refresh_from_db()
+        self.assertFalse(self.book.is_reserved)
@@ -0,0 +1,20 @@
+from django.db import IntegrityError
+from django.test import SimpleTestCase
+from reservations.exceptions import is_active_reservation_conflict
+
+
+class ActiveReservationConflictTests(SimpleTestCase):
+
+    def test_matches_backend_messages(self):
+        cases = [
+            ('duplicate key value violates unique constraint "unique_active_reservation"', True),
+            ("UNIQUE constraint failed: reservations_reservation.book_id", True),
+            ("UNIQUE constraint failed: auth_user.username", False),
+            ("NOT NULL constraint failed: reservations_reservation.book_id", False),
+        ]
+        for message, expected in cases:
+            with self.subTest(message=message):
+                self.assertEqual(is_active_reservation_conflict(IntegrityError(message)), expected)
+
+    def test_other_errors(self):
+        self.assertFalse(is_active_reservation_conflict(ValueError("unique_active_reservation")))
@@ -1,8 +1,16 @@
+from datetime import timedelta
+from io import StringIO
+
+from books.cache import catalog_version
 from books.models import Author, Book
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from reservations.enums import ReservationStatus
-from reservations.models import Reservation
+from reservations.models import Reservation, expire_reservations, repair_reserved_books
+from reservations.tasks import expire_overdue_reservations
 
 
 class ReservationModelTests(TestCase):
@@ -64,3 +72,127 @@ class ReservationModelTests(TestCase):
         reservation.status = ReservationStatus.CANCELED.value
         reservation.save()
         self.assertNotEqual(reservation.updated_at, initial_updated_at)
+
+
+class BookReservedStateTests(TestCase):
+
+    def setUp(self):
+        self.book = Book.objects.create(title="Test Book", isbn13="9780321765723")
+        self.other_book = Book.objects.create(title="Other Book", isbn13="9780321765724")
+
+    def reserved(self, book):
+        return Book.objects.values_list("is_reserved", flat=True).get(pk=book.pk)
+
+    def test_state_follows_reservation_status(self):
+        reservation = Reservation.objects.create(name="Test User", email="test@example.com", book=self.book)
+        self.assertTrue(self.reserved(self.book))
+        self.assertTrue(self.book.is_reserved)
+
+        reservation.status = ReservationStatus.RETURNED.value
+        reservation.save()
+        self.assertFalse(self.reserved(self.book))
+
+    def test_other_changes_leave_book_alone(self):
+        Reservation.objects.create(name="Test User", email="test@example.com", book=self.book)
+        reservation = Reservation.objects.get()
+        reservation.name = "Renamed User"
+
+        with CaptureQueriesContext(connection) as queries:
+            reservation.save()
+
+        self.assertFalse(any("books_book" in query["sql"] for query in queries.captured_queries))
+        self.assertTrue(self.reserved(self.book))
+
+    def test_moving_reservation_to_another_book(self):
+        reservation = Reservation.objects.create(name="Test User", email="test@example.com", book=self.book)
+        reservation = Reservation.objects.get(pk=reservation.pk)
+
+        reservation.book = self.other_book
+        reservation.save()
+
+        self.assertFalse(self.reserved(self.book))
+        self.assertTrue(self.reserved(self.other_book))
+
+    def test_deletes_clear_state(self):
+        reservation = Reservation.objects.create(name="Test User", email="test@example.com", book=self.book)
+        Reservation.objects.create(name="Test User", email="test@example.com", book=self.other_book)
+
+        reservation.delete()
+        self.assertFalse(self.reserved(self.book))
+
+        Reservation.objects.all().delete()
+        self.assertFalse(self.reserved(self.other_book))
+
+    def test_repair(self):
+        Reservation.objects.create(name="Test User", email="test@example.com", book=self.book)
+        Book.objects.filter(pk=self.book.pk).update(is_reserved=False)
+        Book.objects.filter(pk=self.other_book.pk).update(is_reserved=True)
+
+        self.assertEqual(repair_reserved_books(batch_size=1), 2)
+
+        self.assertTrue(self.reserved(self.book))
+        self.assertFalse(self.reserved(self.other_book))
+        self.assertEqual(repair_reserved_books(), 0)
+
+    def test_repair_command(self):
+        Reservation.objects.create(name="Test User", email="test@example.com", book=self.book)
+        Book.objects.filter(pk=self.book.pk).update(is_reserved=False)
+        out = StringIO()
+
+        call_command("repair_reserved_books", stdout=out)
+
+        self.assertTrue(self.reserved(self.book))
+        self.assertIn("Fixed the reserved state of 1 books", out.getvalue())
+
+
+@override_settings(RESERVATION_MAX_HOLD_DAYS=14)
+class ExpireReservationsTests(TestCase):
+
+    def setUp(self):
+        self.books = [Book.objects.create(title=f"Book {index}", isbn13=f"isbn-{index}") for index in range(4)]
+        now = timezone.now()
+        self.overdue = [self.reservation(book, now - timedelta(days=20)) for book in self.books[:3]]
+        self.current = self.reservation(self.books[3], now - timedelta(days=3))
+
+    def reservation(self, book, reserved_at):
+        return Reservation.objects.create(
+            name="Test User", email="test@example.com", book=book, reserved_at=reserved_at
+        )
+
+    def test_expires_overdue_reservations(self):
+        started = timezone.now()
+        self.assertEqual(expire_reservations(batch_size=2), 3)
+
+        for reservation in self.overdue:
+            reservation.refresh_from_db()
+            self.assertEqual(reservation.status, ReservationStatus.EXPIRED.value)
+            self.assertGreaterEqual(reservation.updated_at, started)
+            self.assertIsNone(reservation.returned_at)
+        self.current.refresh_from_db()
+        self.assertEqual(self.current.status, ReservationStatus.RESERVED.value)
+        self.assertEqual(
+            list(Book.objects.order_by("pk").values_list("is_reserved", flat=True)), [False, False, False, True]
+        )
+        self.assertEqual(expire_reservations(), 0)
+
+    def test_closed_reservations_are_left_alone(self):
+        self.overdue[0].status = ReservationStatus.RETURNED.value
+        self.overdue[0].save()
+
+        self.assertEqual(expire_reservations(), 2)
+        self.overdue[0].refresh_from_db()
+        self.assertEqual(self.overdue[0].status, ReservationStatus.RETURNED.value)
+
+    def test_task_reports_and_bumps_catalog_version(self):
+        version = catalog_version()
+        self.assertEqual(expire_overdue_reservations(), 3)
+        self.assertGreater(catalog_version(), version)
+
+        version = catalog_version()
+        self.assertEqual(expire_overdue_reservations(), 0)
+        self.assertEqual(catalog_version(), version)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("expire_reservations", "--batch-size", "1", stdout=out)
+        self.assertIn("Expired 3 reservations", out.getvalue())
@@ -1,6 +1,10 @@
+import threading
+
 from books.models import Author, Book
+from django.db import connection
 from django.test import TransactionTestCase
 from reservations.enums import ReservationStatus
+from reservations.exceptions import ReservationConflict
 from reservations.models import Reservation
 from reservations.serializers import ReservationSerializer
 
@@ -91,3 +95,49 @@ class ReservationSerializerTests(TransactionTestCase):
         serializer = ReservationSerializer(instance=reservation, data=data, partial=True)
         self.assertFalse(serializer.is_valid())
         self.assertIn("is not a valid choice", str(serializer.errors["status"][0]))
+
+    def test_reservation_create_conflict(self):
+        Reservation.objects.create(name="Existing User", email="existing@example.com", book=self.book)
+        data = {
+            "name": "Test User",
+            "email": "test@example.com",
+            "book": self.book.pk
+        }
+        serializer = ReservationSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+
+        with self.assertRaises(ReservationConflict):
+            serializer.save()
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_concurrent_reservations_of_one_book(self):
+        barrier = threading.Barrier(4)
+        results = []
+
+        def reserve(index):
+            data = {
+                "name": f"User {index}",
+                "email": "test@example.com",
+                "book": self.book.pk
+            }
+            serializer = ReservationSerializer(data=data)
+            serializer.is_valid(raise_exception=True)
+            barrier.wait()
+            try:
+                serializer.save()
+                results.append("reserved")
+            except ReservationConflict:
+                results.append("conflict")
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=reserve, args=(index, )) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(results), ["conflict", "conflict", "conflict", "reserved"])
+        self.assertEqual(Reservation.objects.filter(status=ReservationStatus.RESERVED.value).count(), 1)
+        self.book.refresh_from_db()
+        self.assertTrue(self.book.is_reserved)
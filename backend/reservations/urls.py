@@ -1,9 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ReservationViewSet
+from .views import ReservationHistoryViewSet, ReservationViewSet
 
 
 router = DefaultRouter()
+# Registered first, as the reservation detail route would take "history" for a pk
+router.register(r'history', ReservationHistoryViewSet)
 router.register(r'', ReservationViewSet)
 
 urlpatterns = [
@@ -1,9 +1,11 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from .models import Reservation
-from .serializers import ReservationSerializer
+from .bulk import OK, apply_bulk_reservations
+from .models import Reservation, ReservationHistory
+from .serializers import BulkReservationSerializer, ReservationHistorySerializer, ReservationSerializer
 
 
 class IsAdminUser(permissions.BasePermission):
@@ -19,16 +21,17 @@ class ReservationViewSet(viewsets.ModelViewSet):
     Admins can perform all CRUD operations.
     Non-admins can only create reservations.
     """
-    queryset = Reservation.objects.all()
+    # The book is joined for book_title and Reservation.__str__
+    queryset = Reservation.objects.select_related('book')
     serializer_class = ReservationSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter, DjangoFilterBackend]
     filterset_fields = ['book', 'status']
     search_fields = ['name', 'email', 'book__title']
-    ordering_fields = ['reserved_at', 'returned_at', 'status', '-updated_at']
+    ordering_fields = ['reserved_at', 'returned_at', 'status', 'updated_at']
     ordering = ['-updated_at']
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve', 'partial_update', 'update', 'destroy']:
+        if self.action in ['list', 'retrieve', 'partial_update', 'update', 'destroy', 'bulk']:
             return [IsAdminUser()]
         return [permissions.AllowAny()]
 
@@ -65,3 +68,36 @@ class ReservationViewSet(viewsets.ModelViewSet):
 
     def perform_destroy(self, instance):
         instance.delete()
+
+    @action(detail=False, methods=['post'], serializer_class=BulkReservationSerializer)
+    def bulk(self, request):
+        """Reserve, return or cancel many books in one transaction, with a result per item."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = apply_bulk_reservations(serializer.validated_data['items'])
+        succeeded = sum(result['status'] == OK for result in results)
+        return Response({
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'results': results,
+        })
+
+
+class ReservationHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API to browse archived reservations, for admins only.
+    Filtering on reserved_at only scans the matching monthly partitions.
+    """
+    queryset = ReservationHistory.objects.select_related('book')
+    serializer_class = ReservationHistorySerializer
+    permission_classes = [IsAdminUser]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter, DjangoFilterBackend]
+    filterset_fields = {
+        'book': ['exact'],
+        'status': ['exact'],
+        'reserved_at': ['gte', 'lt'],
+    }
+    search_fields = ['name', 'email', 'book__title']
+    ordering_fields = ['reserved_at', 'returned_at', 'archived_at']
+    ordering = ['-reserved_at', '-id']
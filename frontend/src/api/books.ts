@@ -1,3 +1,4 @@
+import { CursorPaginatedResponse } from "../types/Api";
 import { Book } from "../types/Book";
 import api from "./axios";
 import { useInfiniteQuery } from "@tanstack/react-query";
@@ -15,13 +16,15 @@ export const useInfiniteBooks = (
     hasNextPage,
     isFetchingNextPage,
   } = useInfiniteQuery({
-    initialPageParam: 1,
+    initialPageParam: "",
     queryKey: ["books", search, ordering, reservationStatus],
-    queryFn: async ({ pageParam = 1 }) => {
+    queryFn: async ({
+      pageParam = "",
+    }): Promise<CursorPaginatedResponse<Book>> => {
       try {
         const response = await api.get("/api/books/", {
           params: {
-            page: pageParam,
+            cursor: pageParam,
             search,
             ordering,
             reserved:
@@ -33,14 +36,13 @@ export const useInfiniteBooks = (
         return response.data;
       } catch (error) {
         console.error("Error fetching books:", error);
-        return { results: [], count: 0 };
+        return { results: [], next: null, previous: null };
       }
     },
     getNextPageParam: (lastPage) => {
       if (lastPage.next) {
         const url = new URL(lastPage.next);
-        const nextPage = url.searchParams.get("page");
-        return nextPage ? parseInt(nextPage, 10) : undefined;
+        return url.searchParams.get("cursor") ?? undefined;
       }
       return undefined;
     },
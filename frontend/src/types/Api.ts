@@ -4,3 +4,10 @@ export interface PaginatedResponse<T> {
   previous: string | null;
   results: T[];
 }
+
+// Keyset pages of the books endpoint (?cursor=), which carry no count and only link forward
+export interface CursorPaginatedResponse<T> {
+  next: string | null;
+  previous: null;
+  results: T[];
+}